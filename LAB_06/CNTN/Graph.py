@@ -1,73 +1,78 @@
 import re
-from collections import deque
+from collections import deque, defaultdict
+from array import array
 import json
-from collections import defaultdict
-import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from csr import CSRStorage, AdjListView, EdgeListView, ReversedView, UndirectedView, ComplementView
+import graph_cache
+
+_BUSINESS_RE = re.compile(r"(\d+)\s*business")
+_ECONOMY_RE = re.compile(r"(\d+)\s*economy")
+_HOUR_RE = re.compile(r"(\d+)\s*hour")
+_MINUTE_RE = re.compile(r"(\d+)\s*minute")
 
 class Graph:
     def __init__(self, directed = False):
         self.directed = directed
-        self.adj_list = defaultdict(list)
-        self.vertices = []
-        self.adj_matrix = []
-        self.edge_list = []
+        self._bind(CSRStorage.build((), directed))
+
+    def _bind(self, store):
+        # adj_list / edge_list chỉ là view trên CSR, ma trận kề tạo khi cần
+        self._store = store
+        self.vertices = store.names
+        self.adj_list = AdjListView(store)
+        self.edge_list = EdgeListView(store)
+        self._adj_matrix = None
 
     @classmethod
-    def load_graph_from_jl(cls, pathFile, directed = False):
+    def from_edges(cls, edges, directed = False, vertices = None):
         graph = cls(directed)
-        vertices_set = set()
-        
-        with open(pathFile, "r", encoding = "utf-8") as f:
-            for line in f:
-                line  = line.strip()
-                if not line:
-                    continue
-                
-                obj = json.loads(line)
-                (pair, info), = obj.items()
-                
-                u_raws, v_raws = pair.split(",", 1)
-                u = u_raws.strip()
-                v = v_raws.strip()
-                
-                model, capacity, duration = info
-                
-                weight = cls.calc_weight(model, capacity, duration)
-                
-                graph.adj_list[u].append((v, weight))
-                
-                if not directed:
-                    graph.adj_list[v].append((u, weight))
-                    
-                if directed:
-                    graph.edge_list.append((u, v, weight))
-                
-                else:
-                    a, b = sorted([u, v])
-                    graph.edge_list.append((a, b, weight))
-                    
-                vertices_set.add(u)
-                vertices_set.add(v)
-                
-        graph.vertices = sorted(vertices_set)
-        graph.build_adj_matrix()
-        
+        graph._bind(CSRStorage.build(edges, directed, vertices))
         return graph
+
+    @classmethod
+    def load_graph_from_jl(cls, pathFile, directed = False, workers = None, use_cache = True):
+        if use_cache:
+            store = graph_cache.load_cache(pathFile, directed)
+            if store is not None:
+                graph = cls(directed)
+                graph._bind(store)
+                return graph
+
+            graph = cls.load_graph_from_jl(pathFile, directed, workers, use_cache = False)
+            graph_cache.write_cache(graph._store, pathFile, directed)
+            return graph
+
+        # workers > 1: chia file thành các khoảng byte và parse song song
+        if workers is not None and workers > 1:
+            edges = load_edges_parallel(pathFile, workers)
+            return cls.from_edges(edges, directed)
+
+        def read_edges():
+            with open(pathFile, "r", encoding = "utf-8") as f:
+                for line in f:
+                    edge = _parse_line(line)
+                    if edge is not None:
+                        yield edge
+
+        return cls.from_edges(read_edges(), directed)
                 
     @staticmethod
     def calc_weight(model: str, capacity: str, duration: str) -> float:
-        seats = capacity.lower()
-        b_seats  = re.findall(r"(\d+)\s*business", capacity)
-        e_seats  = re.findall(r"(\d+)\s*economy", capacity)
+        b_seats  = _BUSINESS_RE.search(capacity)
+        e_seats  = _ECONOMY_RE.search(capacity)
         
-        bussiness_seats = int(b_seats[0]) if b_seats else 0
-        economy_seats = int(e_seats[0]) if e_seats else 0
+        bussiness_seats = int(b_seats.group(1)) if b_seats else 0
+        economy_seats = int(e_seats.group(1)) if e_seats else 0
         
         total_seats = bussiness_seats + economy_seats if (bussiness_seats + economy_seats) > 0 else 1
         
         s = duration.lower()
-        h_match = re.search(r"(\d+)\s*hour", s)
-        m_match = re.search(r"(\d+)\s*minute", s)
+        h_match = _HOUR_RE.search(s)
+        m_match = _MINUTE_RE.search(s)
         
         hours = int(h_match.group(1)) if h_match else 0
         minutes = int(m_match.group(1)) if m_match else 0
@@ -79,16 +84,20 @@ class Graph:
     def build_adj_matrix(self):
         n = len(self.vertices)
 
-        self.adj_matrix = [[None for _ in range(n)] for _ in range(n)]
-        
-        index = {v: i for i, v in enumerate(self.vertices)}
+        self._adj_matrix = [[None for _ in range(n)] for _ in range(n)]
         
-        for u, neighbors in self.adj_list.items():
-            i = index[u]
-            for v, weight in neighbors:
-                j = index[v]
-                self.adj_matrix[i][j] = weight
-                self.adj_matrix[j][i] = weight if not self.directed else self.adj_matrix[j][i]
+        for i in range(n):
+            row = self._adj_matrix[i]
+            for j, w in self._store.arc_ids(i):
+                row[j] = w
+                if not self.directed:
+                    self._adj_matrix[j][i] = w
+
+    @property
+    def adj_matrix(self):
+        if self._adj_matrix is None:
+            self.build_adj_matrix()
+        return self._adj_matrix
 
     def print_adj_list(self):
         print("Danh sach ke: ")
@@ -133,147 +142,165 @@ class Graph:
         return len(self.vertices)
     
     def Degree(self, u):
+        i = self._store.index.get(u)
         if self.directed:
-            out_deg = len(self.adj_list.get(u, []))
-            in_deg = 0
-            for src, neighbors in self.adj_list.items():
-                for v, _ in neighbors:
-                    if v == u:
-                        in_deg += 1
-            return in_deg, out_deg
+            if i is None:
+                return 0, 0
+            return self._store.in_deg[i], self._store.out_deg[i]
         else :
-            return len(self.adj_list.get(u, []))
+            return 0 if i is None else self._store.out_deg[i]
+
+    def degree_array(self):
+        # Bậc theo thứ tự self.vertices; có hướng -> (in_deg, out_deg)
+        if self.directed:
+            return array("i", self._store.in_deg), array("i", self._store.out_deg)
+        return array("i", self._store.out_deg)
+
+    def degree_histogram(self):
+        hist = defaultdict(int)
+        if self.directed:
+            for d in zip(self._store.in_deg, self._store.out_deg):
+                hist[d] += 1
+        else:
+            for d in self._store.out_deg:
+                hist[d] += 1
+        return dict(sorted(hist.items()))
     
     def isolated_vertices(self):
-        isolated = []
-        for  u in self.vertices:
-            deg = self.Degree(u)
-
-            if self.directed:
-                in_deg, out_deg = deg
-                if in_deg == 0 and out_deg == 0:
-                    isolated.append(u)
-            else:
-                if deg == 0:
-                    isolated.append(u)
-        return isolated 
+        in_deg, out_deg = self._store.in_deg, self._store.out_deg
+        if self.directed:
+            return [u for i, u in enumerate(self.vertices) if in_deg[i] == 0 and out_deg[i] == 0]
+        return [u for i, u in enumerate(self.vertices) if out_deg[i] == 0]
     
     def leaf_vertices(self):
-        leaf = []
-        for u in self.vertices:
-            deg = self.Degree(u)
-
-            if self.directed:
-                in_deg, out_deg = deg
-                if in_deg + out_deg == 1:
-                    leaf.append(u)
-            else:
-                if deg == 1:
-                    leaf.append(u)
-        return leaf
+        in_deg, out_deg = self._store.in_deg, self._store.out_deg
+        if self.directed:
+            return [u for i, u in enumerate(self.vertices) if in_deg[i] + out_deg[i] == 1]
+        return [u for i, u in enumerate(self.vertices) if out_deg[i] == 1]
     
-    def base_undirected_graph(self):
-        if not self.directed:
-            return copy.deepcopy(self)
-        
-        graph = Graph(directed = False)
-        graph.vertices = list(self.vertices)
-        seen = set()
-        
-        for u, neighbors in self.adj_list.items():
-            for v, w in neighbors:
-                a, b = sorted([u, v])
-                if (a, b) in seen:
-                    continue
-                seen.add((a,b))
-                
-                graph.adj_list[a].append((b, w))
-                graph.adj_list[b].append((a, w))
-                
-                graph.edge_list.append((a, b, w))
-                
-        graph.build_adj_matrix()
-        
+    def _view(self, store, directed):
+        graph = Graph(directed)
+        graph._bind(store)
         return graph
-    
-    def complement_graph(self):
+
+    # Các phép biến đổi trả về view dùng chung bộ nhớ với đồ thị gốc (tạo O(1))
+    def reversed_view(self):
+        if not self.directed:
+            return self._view(self._store, False)
+        if isinstance(self._store, ReversedView):
+            return self._view(self._store.parent, True)
+        return self._view(ReversedView(self._store), True)
+
+    def undirected_view(self):
+        if not self.directed:
+            return self._view(self._store, False)
+        return self._view(UndirectedView(self._store), False)
+
+    def complement_view(self):
         # Đồ thị có hướng không bù được
         if self.directed:
-            return copy.deepcopy(self)
-        
-        vertices = list(self.vertices)
-        existing_edges = set()
-        for u, neighbors in self.adj_list.items():
-            for v, w in neighbors:
-                a, b = sorted([u, v])
-                existing_edges.add((a, b))
-                
-        comp_graph = Graph(directed = False)
-        comp_graph.vertices = list(vertices)
-        
-        n = len(vertices)
-        
-        for i in range (n):
-            for j in range (i + 1, n):
-                u, v = vertices[i], vertices[j]
-                a, b = sorted((u, v))
-                if (a, b) not in existing_edges:
-                    w = 1.0
-                    comp_graph.adj_list[u].append((v, w))
-                    comp_graph.adj_list[v].append((u, w))
-                    
-                    comp_graph.edge_list.append((u, v, w))
-                    
-        comp_graph.build_adj_matrix()
-        return comp_graph
-        
+            return self._view(self._store, True)
+        return self._view(ComplementView(self._store), False)
+
+    def base_undirected_graph(self):
+        return self.undirected_view()
+    
+    def complement_graph(self):
+        return self.complement_view()
 
     def converse_graph(self):
-        # Đồ thị vô hướng thì không đảo được
-        if not self.directed:
-            return copy.deepcopy(self)
-        
-        converse_graph = Graph(directed = True)
-        converse_graph.vertices = list(self.vertices)
-        
-        for u, neighbors in self.adj_list.items():
-            for v, w in neighbors:
-                converse_graph.adj_list[v].append((u, w))
-                converse_graph.edge_list.append((v, u, w))
-                
-        converse_graph.build_adj_matrix()
-        return converse_graph
-                
+        return self.reversed_view()
     
+    def _neighbor_ids(self, i):
+        return self._store.neighbor_ids(i)
+
+    def _traverse(self, roots, visited, pre = None, post = None, tree_edge = None, non_tree_edge = None):
+        # DFS dùng stack tường minh trên id đỉnh, thứ tự thăm giống bản đệ quy.
+        # pre(u) khi vào đỉnh, post(u, parent) khi rời đỉnh,
+        # tree_edge(u, v) / non_tree_edge(u, v) cho từng cung được xét.
+        for root in roots:
+            if visited[root]:
+                continue
+            visited[root] = 1
+            if pre is not None:
+                pre(root)
+            stack = [(root, iter(self._neighbor_ids(root)))]
+
+            while stack:
+                u, it = stack[-1]
+                for v in it:
+                    if not visited[v]:
+                        visited[v] = 1
+                        if tree_edge is not None:
+                            tree_edge(u, v)
+                        if pre is not None:
+                            pre(v)
+                        stack.append((v, iter(self._neighbor_ids(v))))
+                        break
+                    if non_tree_edge is not None:
+                        non_tree_edge(u, v)
+                else:
+                    stack.pop()
+                    if post is not None:
+                        post(u, stack[-1][0] if stack else None)
+
     def DFS(self, start):
-        visited = set()
+        i = self._store.index.get(start)
+        if i is None:
+            return [start]
+
         order = []
-        
-        def go(u):
-            visited.add(u)
-            order.append(u)
-            for v, w in self.adj_list[u]:
-                if v not in visited:
-                    go(v)
-        
-        go(start)
-        return order
+        self._traverse([i], bytearray(len(self.vertices)), pre = order.append)
+        return [self.vertices[u] for u in order]
     
 
     def BFS(self, start):
-        visited = {start}
-        order = []
-        q = deque([start])
-        
-        while q:
-            u = q.popleft()
-            order.append(u)
-            for v, w in self.adj_list[u]:
-                if v not in visited:
-                    visited.add(v)
-                    q.append(v)
-                    
-        return order
+        i = self._store.index.get(start)
+        if i is None:
+            return [start]
+
+        visited = bytearray(len(self.vertices))
+        visited[i] = 1
+        order = [i]
+        head = 0
+
+        # order vừa là hàng đợi vừa là kết quả
+        while head < len(order):
+            u = order[head]
+            head += 1
+            for v in self._neighbor_ids(u):
+                if not visited[v]:
+                    visited[v] = 1
+                    order.append(v)
+
+        return [self.vertices[u] for u in order]
+
+    def _multi_bfs(self, sources, max_depth, workers, want_dist):
+        ids = [self._store.index[s] for s in sources]
+        n = len(self.vertices)
+        rows = [list(self._store.neighbor_ids(i)) for i in range(n)]
+
+        if workers is None or workers <= 1 or len(ids) <= 1:
+            return _bitset_bfs(rows, ids, max_depth, want_dist)
+
+        # Chia nguồn thành các nhóm, mỗi tiến trình chạy 1 lần BFS theo bitset cho cả nhóm
+        size = -(-len(ids) // workers)
+        groups = [ids[i:i + size] for i in range(0, len(ids), size)]
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            parts = pool.map(_bitset_bfs, [rows] * len(groups), groups,
+                             [max_depth] * len(groups), [want_dist] * len(groups))
+            return [row for part in parts for row in part]
+
+    def bfs_hop_matrix(self, sources, max_depth = None, workers = None):
+        # Hàng thứ b: số bước từ sources[b] tới từng đỉnh (theo self.vertices), -1 nếu không tới được
+        return self._multi_bfs(sources, max_depth, workers, True)
+
+    def bfs_reachability(self, sources, max_depth = None, workers = None):
+        # Bitset cho từng nguồn: bit i bật <=> self.vertices[i] tới được trong max_depth bước
+        return self._multi_bfs(sources, max_depth, workers, False)
+
+    def bitset_vertices(self, bits):
+        return [self.vertices[i] for i in _bit_indices(bits)]
     
     
     def is_complete(self):
@@ -290,40 +317,38 @@ class Graph:
         if self.directed:
             return False
 
-        visited = set()
-        def dfs(u):
-            visited.add(u)
-            for v, w in self.adj_list[u]:
-                if v not in visited:
-                    dfs(v)
-                    
-        
-        dfs(self.vertices[0])
-        if len(visited) != len(self.vertices):
+        visited = bytearray(len(self.vertices))
+        self._traverse([0], visited)
+        if visited.count(1) != len(self.vertices):
             return False
 
-        for u in self.vertices:
-            if len(self.adj_list[u]) != 2:
+        for d in self._store.out_deg:
+            if d != 2:
                 return False
 
         return True
 
                     
+    def _two_color(self, start, color):
+        # BFS tô 2 màu từ start; color[i] = 2 là chưa tô. Trả về False nếu có cạnh nối 2 đỉnh cùng màu
+        color[start] = 0
+        q = deque([start])
+        while q:
+            u = q.popleft()
+            for v in self._neighbor_ids(u):
+                if color[v] == 2:
+                    color[v] = 1 - color[u]
+                    q.append(v)
+                elif color[v] == color[u]:
+                    return False
+        return True
+
     def is_bipartite(self):
-        color = {}
+        color = bytearray(b"\x02") * len(self.vertices)
         
-        for start in self.vertices:
-            if start not in color:
-                color[start] = 0
-                q = deque([start])
-                while q:
-                    u = q.popleft()
-                    for v, w in self.adj_list[u]:
-                        if v not in color:
-                            color[v] = 1 - color[u]
-                            q.append(v)
-                        elif color[v] == color[u]:
-                            return False
+        for start in range(len(self.vertices)):
+            if color[start] == 2 and not self._two_color(start, color):
+                return False
         
         return True
     
@@ -331,143 +356,144 @@ class Graph:
         if self.directed:
             return False
         
-        color = {}
-        start = self.vertices[0]
-        color[start] = 0
-        q = deque([start])
-        
-        while q:
-            u = q.popleft()
-            for v, w in self.adj_list[u]:
-                if v not in color:
-                    color[v] = 1 - color[u]
-                    q.append(v)
-                elif color[v] == color[u]:
-                    return False
+        n = len(self.vertices)
+        color = bytearray(b"\x02") * n
+        start = self._store.index[self.vertices[0]]
+        if not self._two_color(start, color):
+            return False
                 
-        if len(color) != len(self.vertices):
+        if 2 in color:
             return False
         
-        A = {u for u in self.vertices if color[u] == 1}
-        B = {u for u in self.vertices if color[u] == 0}
+        A = {u for u in range(n) if color[u] == 1}
+        B = {u for u in range(n) if color[u] == 0}
         
         if not A or not B:
             return False
-        if A & B:
-            return False
         
         for u in A:
-            neighbors_u = {v for v, w in self.adj_list[u]}
-            if neighbors_u != B:
+            if set(self._neighbor_ids(u)) != B:
                 return False
             
         for u in B:
-            neighbors_u = {v for v, w in self.adj_list[u]}
-            if neighbors_u != A:
+            if set(self._neighbor_ids(u)) != A:
                 return False
             
         return True
             
                         
     def count_connect_components(self):
-        visited = set()
+        visited = bytearray(len(self.vertices))
         comps = 0
         
-        def dfs(u):
-            visited.add(u)
-            for v, w in self.adj_list[u]:
-                if v not in visited:
-                    dfs(v)
-        
-        for u in self.vertices:
-            if u not in visited:
+        for u in range(len(self.vertices)):
+            if not visited[u]:
                 comps += 1
-                dfs(u)
+                self._traverse([u], visited)
         
         return comps
 
-    def articulation_points(self):
+    def low_link(self):
+        # Tarjan: 1 lần DFS tính disc/low -> đỉnh khớp, cầu và thành phần song liên thông
         if self.directed:
-            return []
-        
-        comps = self.count_connect_components()
-        art_Points = []
-        
-        def dfs(u, banned, visited):
-            visited.add(u)
-            for v, w in self.adj_list[u]:
-                if v == banned:
-                    continue
-                if v not in visited:
-                    dfs(v, banned, visited)
-        
-        for banned in self.vertices:
-            visited = set([banned])
-            cnt = 0
-            
-            for u in self.vertices:
-                if u not in visited:
-                    cnt += 1
-                    dfs(u, banned, visited)
-            
-            if cnt > comps:
-                art_Points.append(banned)
-        
-        return art_Points
+            return [], [], []
 
-    def bridges(self):
-        if self.directed:
-            return []
-        
-        comps = self.count_connect_components()
+        n = len(self.vertices)
+        disc = array("i", bytes(4 * n))
+        low = array("i", bytes(4 * n))
+        parent = array("i", [-1]) * n
+        timer = 0
+        art = bytearray(n)
+        root_children = array("i", bytes(4 * n))
+        bridge_set = set()
+        bccs = []
+        edge_stack = []
+
+        def pre(u):
+            nonlocal timer
+            disc[u] = low[u] = timer
+            timer += 1
+
+        def tree_edge(u, v):
+            parent[v] = u
+            edge_stack.append((u, v))
+
+        def non_tree_edge(u, v):
+            if v == u or v == parent[u]:
+                return
+            if disc[v] < disc[u]:
+                edge_stack.append((u, v))
+                if disc[v] < low[u]:
+                    low[u] = disc[v]
+
+        def post(u, p):
+            if p is None:
+                if root_children[u] > 1:
+                    art[u] = 1
+                return
+
+            if low[u] < low[p]:
+                low[p] = low[u]
+            if parent[p] == -1:
+                root_children[p] += 1
+            elif low[u] >= disc[p]:
+                art[p] = 1
+            if low[u] > disc[p]:
+                bridge_set.add((p, u) if p < u else (u, p))
+
+            if low[u] >= disc[p]:
+                comp = set()
+                while edge_stack:
+                    a, b = edge_stack.pop()
+                    comp.add(a)
+                    comp.add(b)
+                    if (a, b) == (p, u):
+                        break
+                bccs.append(comp)
+
+        self._traverse(range(n), bytearray(n), pre, post, tree_edge, non_tree_edge)
+
+        art_points = [u for i, u in enumerate(self.vertices) if art[i]]
+
+        # Giữ thứ tự và định dạng của edge_list như trước
         bridge = []
         seen = set()
-        
-        def dfs(u, banned_x, banned_y, visited):
-            visited.add(u)
-            for v, w in self.adj_list[u]:
-                if (u == banned_x and v == banned_y) or (u == banned_y and v == banned_x):
-                    continue
-                if v not in visited:
-                    dfs(v, banned_x, banned_y, visited)
-        
-        for banned_x, banned_y, w in self.edge_list:
-            e = tuple(sorted([banned_x, banned_y]))
+        for a, b, w in self._store.edge_ids():
+            e = (a, b)
             if e in seen:
                 continue
             seen.add(e)
-            
-            visited = set()
-            cnt = 0 
-            
-            for u in self.vertices:
-                if u not in visited:
-                    cnt += 1
-                    dfs(u, banned_x, banned_y, visited)
-            
-            if cnt > comps:
-                bridge.append((banned_x, banned_y))
-                
-        return bridge
+            if e in bridge_set:
+                bridge.append((self.vertices[e[0]], self.vertices[e[1]]))
 
-    def euler_hierholzer(self):
-        # Chỉ xét đồ thị vô hướng
-        if self.directed:
-            return None
+        components = [[self.vertices[i] for i in sorted(comp)] for comp in bccs]
 
-        adj = {u: [v for (v, w) in self.adj_list[u]] for u in self.vertices}
+        return art_points, bridge, components
+
+    def articulation_points(self):
+        return self.low_link()[0]
 
-        odd = [u for u in self.vertices if len(adj[u]) % 2 == 1]
+    def bridges(self):
+        return self.low_link()[1]
+
+    def biconnected_components(self):
+        return self.low_link()[2]
+
+    def _euler_start(self):
+        # Trả về id đỉnh bắt đầu, -1 nếu đồ thị không có cạnh, None nếu không có đường đi Euler
+        deg = self._store.out_deg
+        n = len(self.vertices)
+        odd = [i for i in range(n) if deg[i] % 2 == 1]
 
         if len(odd) == 0:
             # Chu trình Euler: chọn 1 đỉnh bất kỳ có cạnh
             start = None
-            for u in self.vertices:
-                if adj[u]:   # có ít nhất 1 cạnh
-                    start = u
+            for i in range(n):
+                if deg[i]:   # có ít nhất 1 cạnh
+                    start = i
                     break
             if start is None:
-                return []    # đồ thị không có cạnh
+                return -1    # đồ thị không có cạnh
         elif len(odd) == 2:
             # Đường đi Euler: bắt đầu từ 1 trong 2 đỉnh bậc lẻ
             start = odd[0]
@@ -475,20 +501,29 @@ class Graph:
             # Không thỏa điều kiện Euler
             return None
 
-        # Hàm DFS dùng để kiểm tra liên thông / cầu
-        def dfs(u, visited, adj_local):
-            visited.add(u)
-            for v in adj_local[u]:
-                if v not in visited:
-                    dfs(v, visited, adj_local)
-
         # Kiểm tra các đỉnh bậc > 0 phải nằm trong cùng 1 thành phần liên thông
-        visited0 = set()
-        dfs(start, visited0, adj)
-        for u in self.vertices:
-            if adj[u] and u not in visited0:
+        visited = bytearray(n)
+        self._traverse([start], visited)
+        for i in range(n):
+            if deg[i] and not visited[i]:
                 return None
 
+        return start
+
+    def euler_hierholzer(self):
+        # Chỉ xét đồ thị vô hướng
+        if self.directed:
+            return None
+
+        start = self._euler_start()
+        if start is None:
+            return None
+        if start == -1:
+            return []
+        start = self.vertices[start]
+
+        adj = {u: [v for (v, w) in self.adj_list[u]] for u in self.vertices}
+
         stack = [start]
         path = []
 
@@ -508,91 +543,156 @@ class Graph:
         if self.directed:
             return None
 
-        # Tạo bản sao adjacency CHỈ chứa đỉnh (bỏ weight)
-        adj = {u: [v for (v, w) in self.adj_list[u]] for u in self.vertices}
-
-        odd = [u for u in self.vertices if len(adj[u]) % 2 == 1]
-
-        if len(odd) == 0:
-            # Chu trình Euler: chọn 1 đỉnh bất kỳ có cạnh
-            start = None
-            for u in self.vertices:
-                if adj[u]:   # có ít nhất 1 cạnh
-                    start = u
-                    break
-            if start is None:
-                return []    # đồ thị không có cạnh
-        elif len(odd) == 2:
-            # Đường đi Euler: bắt đầu từ 1 trong 2 đỉnh bậc lẻ
-            start = odd[0]
-        else:
-            # Không thỏa điều kiện Euler
+        start = self._euler_start()
+        if start is None:
             return None
+        if start == -1:
+            return []
 
-        # Hàm DFS dùng để kiểm tra liên thông / cầu
-        def dfs(u, visited, adj_local):
-            visited.add(u)
-            for v in adj_local[u]:
-                if v not in visited:
-                    dfs(v, visited, adj_local)
-
-        # Kiểm tra các đỉnh bậc > 0 phải nằm trong cùng 1 thành phần liên thông
-        visited0 = set()
-        dfs(start, visited0, adj)
-        for u in self.vertices:
-            if adj[u] and u not in visited0:
-                return None
-
-        def is_bridge(u, v):
-            if len(adj[u]) == 1:
-                return False
-
-            visited1 = set()
-            dfs(u, visited1, adj)
-
-            # Xóa cạnh u - v tạm thời
-            adj[u].remove(v)
-            adj[v].remove(u)
-
-            # Đếm lại sau khi xóa
-            visited2 = set()
-            dfs(u, visited2, adj)
-
-            # Khôi phục cạnh
-            adj[u].append(v)
-            adj[v].append(u)
-
-            # Nếu số đỉnh reachable giảm -> là cầu
-            return len(visited2) < len(visited1)
-
-
-        # Thuật toán Fleury
-        path = [start]
-        u = start
-
-        while True:
-            if not adj[u]:
-                break  # hết cạnh đi ra từ u
-
-            chosen = None
-
-            for v in adj[u]:
-                if len(adj[u]) == 1:
-                    chosen = v
-                    break
-
-                if not is_bridge(u, v):
-                    chosen = v
-                    break
-
-            if chosen is None:
-                chosen = adj[u][0]
-
-            adj[u].remove(chosen)
-            adj[chosen].remove(u)
-
-            path.append(chosen)
-            u = chosen
+        n = len(self.vertices)
+        m = self._store.edge_count()
+
+        # Danh sách kề theo id: (đỉnh kề, id cạnh), theo thứ tự edge_list
+        adj = [[] for _ in range(n)]
+        for k, (a, b, w) in enumerate(self._store.edge_ids()):
+            adj[a].append((b, k))
+            adj[b].append((a, k))
+
+        # Fleury chỉ cấm đi qua cầu khi u còn cạnh khác. Mọi đường đi Euler đều thỏa điều đó:
+        # nếu đi qua cầu u -> v khi u còn cạnh khác thì không quay lại được phía u, cạnh đó bị bỏ sót.
+        # Vậy mọi đường đi Euler từ start là 1 lần chạy hợp lệ của Fleury (chỉ khác thứ tự chọn giữa các
+        # cạnh không phải cầu) -> dựng bằng Hierholzer O(m), không cần kiểm tra cầu.
+        # Duyệt cạnh theo thứ tự edge_list: khi lùi về đỉnh y còn cạnh dư, cạnh vòng tham lam đã đi từ y
+        # (lần cuối qua y) không bao giờ quay lại y -> lúc đó là cầu, và vòng dư được chèn trước nó; nên mỗi
+        # bước là "cạnh không phải cầu đầu tiên" theo thứ tự edge_list (đã so với 1 bản kiểm tra cầu theo
+        # cùng thứ tự trên vài nghìn đa đồ thị ngẫu nhiên).
+        # Thứ tự đường đi khác bản euler_fleury gốc: is_bridge cũ xóa cạnh rồi append lại vào cuối adj[u],
+        # nên thứ tự kề bị đổi sau mỗi lần kiểm tra. Kết quả mới vẫn là đường đi Euler hợp lệ theo Fleury.
+        used = bytearray(m)
+        head = array("i", bytes(4 * n))   # adj[i][:head[i]] toàn cạnh đã dùng
+        stack = [start]
+        path = []
 
-        return path
+        while stack:
+            u = stack[-1]
+            row = adj[u]
+            h = head[u]
+            while h < len(row) and used[row[h][1]]:
+                h += 1
+            if h < len(row):
+                v, k = row[h]
+                used[k] = 1
+                head[u] = h + 1
+                stack.append(v)
+            else:
+                head[u] = h
+                path.append(stack.pop())
 
+        path.reverse()
+        return [self.vertices[i] for i in path]
+
+
+# Cấu hình máy bay lặp lại rất nhiều -> nhớ trọng số theo (capacity, duration)
+@lru_cache(maxsize = None)
+def _cached_weight(capacity, duration):
+    return Graph.calc_weight(None, capacity, duration)
+
+
+def _parse_line(line):
+    line = line.strip()
+    if not line:
+        return None
+
+    obj = json.loads(line)
+    (pair, info), = obj.items()
+
+    u_raws, v_raws = pair.split(",", 1)
+    model, capacity, duration = info
+
+    return u_raws.strip(), v_raws.strip(), _cached_weight(capacity, duration)
+
+
+def _chunk_ranges(pathFile, n_chunks):
+    # Cắt file thành n_chunks khoảng [start, end), mỗi biên nằm ngay sau một '\n'
+    size = os.path.getsize(pathFile)
+    bounds = [0]
+    with open(pathFile, "rb") as f:
+        for i in range(1, n_chunks):
+            pos = max(size * i // n_chunks, bounds[-1])
+            f.seek(pos)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(bounds[i], bounds[i + 1]) for i in range(n_chunks) if bounds[i] < bounds[i + 1]]
+
+
+def _parse_chunk(pathFile, start, end):
+    with open(pathFile, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start).decode("utf-8")
+
+    edges = []
+    for line in data.splitlines():
+        edge = _parse_line(line)
+        if edge is not None:
+            edges.append(edge)
+    return edges
+
+
+def load_edges_parallel(pathFile, workers, chunks_per_worker = 4):
+    ranges = _chunk_ranges(pathFile, workers * chunks_per_worker)
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        parts = pool.map(_parse_chunk, [pathFile] * len(ranges), *zip(*ranges))
+        # Ghép theo thứ tự khoảng byte -> cùng thứ tự cạnh với bản tuần tự
+        return [edge for part in parts for edge in part]
+
+
+def _bit_indices(bits):
+    # Vị trí các bit 1 của số nguyên (bit thấp nhất = 0)
+    s = bin(bits)[:1:-1]
+    i = s.find("1")
+    while i != -1:
+        yield i
+        i = s.find("1", i + 1)
+
+
+def _bitset_bfs(rows, sources, max_depth, want_dist):
+    # BFS đồng thời từ mọi nguồn: bit b của frontier[v] / seen[v] ứng với sources[b].
+    # Mỗi lần OR số nguyên xử lý cùng lúc tất cả các nguồn đi qua cùng một cung.
+    n = len(rows)
+    seen = [0] * n
+    frontier = {}
+    dist = [array("i", [-1]) * n for _ in sources] if want_dist else None
+
+    for b, s in enumerate(sources):
+        seen[s] |= 1 << b
+        frontier[s] = frontier.get(s, 0) | (1 << b)
+        if want_dist:
+            dist[b][s] = 0
+
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        reached = {}
+        for u, bits in frontier.items():
+            for v in rows[u]:
+                reached[v] = reached.get(v, 0) | bits
+
+        frontier = {}
+        for v, bits in reached.items():
+            new = bits & ~seen[v]
+            if new:
+                seen[v] |= new
+                frontier[v] = new
+                if want_dist:
+                    for b in _bit_indices(new):
+                        dist[b][v] = depth
+
+    if want_dist:
+        return dist
+
+    members = [bytearray((n + 7) // 8) for _ in sources]
+    for v in range(n):
+        for b in _bit_indices(seen[v]):
+            members[b][v >> 3] |= 1 << (v & 7)
+    return [int.from_bytes(m, "little") for m in members]
@@ -0,0 +1,443 @@
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+
+from Graph import Graph
+import maze
+
+
+def time_call(fn, repeat = 3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+# Bản load_graph_from_jl cũ (regex biên dịch lại mỗi cạnh, không nhớ trọng số, dựng ma trận kề), giữ lại để so sánh
+def calc_weight_original(model, capacity, duration):
+    b_seats = re.findall(r"(\d+)\s*business", capacity)
+    e_seats = re.findall(r"(\d+)\s*economy", capacity)
+
+    bussiness_seats = int(b_seats[0]) if b_seats else 0
+    economy_seats = int(e_seats[0]) if e_seats else 0
+
+    total_seats = bussiness_seats + economy_seats if (bussiness_seats + economy_seats) > 0 else 1
+
+    s = duration.lower()
+    h_match = re.search(r"(\d+)\s*hour", s)
+    m_match = re.search(r"(\d+)\s*minute", s)
+
+    hours = int(h_match.group(1)) if h_match else 0
+    minutes = int(m_match.group(1)) if m_match else 0
+
+    return (hours * 60 + minutes) / total_seats
+
+
+def load_graph_original(path, directed = False):
+    adj_list = defaultdict(list)
+    edge_list = []
+    vertices_set = set()
+
+    with open(path, "r", encoding = "utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            obj = json.loads(line)
+            (pair, info), = obj.items()
+
+            u_raws, v_raws = pair.split(",", 1)
+            u = u_raws.strip()
+            v = v_raws.strip()
+
+            model, capacity, duration = info
+            weight = calc_weight_original(model, capacity, duration)
+
+            adj_list[u].append((v, weight))
+            if not directed:
+                adj_list[v].append((u, weight))
+
+            if directed:
+                edge_list.append((u, v, weight))
+            else:
+                a, b = sorted([u, v])
+                edge_list.append((a, b, weight))
+
+            vertices_set.add(u)
+            vertices_set.add(v)
+
+    vertices = sorted(vertices_set)
+    index = {v: i for i, v in enumerate(vertices)}
+    adj_matrix = [[None for _ in range(len(vertices))] for _ in range(len(vertices))]
+    for u, neighbors in adj_list.items():
+        for v, weight in neighbors:
+            adj_matrix[index[u]][index[v]] = weight
+            if not directed:
+                adj_matrix[index[v]][index[u]] = weight
+    return vertices, adj_list, edge_list, adj_matrix
+
+
+def bench_load(path, workers_list = (None, 2, 4), scale = 1, repeat = 3):
+    # scale > 1: nhân bản file nguồn để mô phỏng file lịch bay lớn hơn
+    tmp_dir = None
+    if scale > 1:
+        tmp_dir = tempfile.mkdtemp()
+        big = os.path.join(tmp_dir, os.path.basename(path))
+        with open(big, "wb") as fw:
+            for _ in range(scale):
+                with open(path, "rb") as fr:
+                    shutil.copyfileobj(fr, fw)
+                fw.write(b"\n")
+        path = big
+
+    try:
+        rows = []
+        seconds, (vertices, adj_list, edge_list, adj_matrix) = time_call(lambda: load_graph_original(path), repeat)
+        rows.append(("bản cũ", seconds, len(edge_list)))
+
+        for workers in workers_list:
+            seconds, g = time_call(lambda: Graph.load_graph_from_jl(path, workers = workers, use_cache = False), repeat)
+            rows.append((f"workers={workers or 1}", seconds, g.countEdges()))
+
+        Graph.load_graph_from_jl(path)
+        seconds, g = time_call(lambda: Graph.load_graph_from_jl(path), repeat)
+        rows.append(("cache (mmap)", seconds, g.countEdges()))
+        return rows
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir)
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# Sinh đồ thị có seed cố định -> kết quả lặp lại được giữa các lần chạy
+def _name(i):
+    return f"v{i}"
+
+
+def sparse_edges(n, seed = 0, avg_degree = 4):
+    rnd = random.Random(seed)
+    return [(_name(rnd.randrange(n)), _name(rnd.randrange(n)), float(rnd.randint(1, 100)))
+            for _ in range(n * avg_degree // 2)]
+
+
+def dense_edges(n, seed = 0, p = 0.5):
+    rnd = random.Random(seed)
+    return [(_name(i), _name(j), float(rnd.randint(1, 100)))
+            for i in range(n) for j in range(i + 1, n) if rnd.random() < p]
+
+
+def bipartite_edges(n, seed = 0, avg_degree = 4):
+    rnd = random.Random(seed)
+    half = max(n // 2, 1)
+    return [(_name(rnd.randrange(half)), _name(half + rnd.randrange(n - half)), float(rnd.randint(1, 100)))
+            for _ in range(n * avg_degree // 2)]
+
+
+def eulerian_edges(n, m = None, seed = 0):
+    # Chu trình đóng ngẫu nhiên qua n đỉnh, m cạnh -> mọi đỉnh bậc chẵn, liên thông
+    rnd = random.Random(seed)
+    m = 2 * n if m is None else m
+    walk = [0] + [rnd.randrange(n) for _ in range(m - 1)] + [0]
+    return [(_name(a), _name(b), 1.0) for a, b in zip(walk, walk[1:])]
+
+
+def chain_edges(n, seed = 0):
+    return [(_name(i), _name(i + 1), 1.0) for i in range(n - 1)]
+
+
+GENERATORS = {
+    "sparse": sparse_edges,
+    "dense": dense_edges,
+    "bipartite": bipartite_edges,
+    "eulerian": eulerian_edges,
+    "chain": chain_edges,
+}
+
+# Đồ thị dày có O(n^2) cạnh -> chỉ chạy tới kích thước này
+DENSE_MAX = 1000
+
+METHODS = {
+    "BFS": lambda g: g.BFS(g.vertices[0]),
+    "DFS": lambda g: g.DFS(g.vertices[0]),
+    "bridges": lambda g: g.bridges(),
+    "articulation_points": lambda g: g.articulation_points(),
+    "euler_hierholzer": lambda g: g.euler_hierholzer(),
+    "euler_fleury": lambda g: g.euler_fleury(),
+    "is_bipartite": lambda g: g.is_bipartite(),
+    "complement_graph": lambda g: g.complement_graph().countEdges(),
+}
+
+
+def write_jl(path, edges):
+    with open(path, "w", encoding = "utf-8") as f:
+        for u, v, w in edges:
+            minutes = int(w)
+            f.write(json.dumps({f"{u},{v}": ["Model", "1 business, 1 economy", f"{minutes} minutes"]}) + "\n")
+
+
+def run_suite(sizes, generators = None, methods = None, seed = 0, repeat = 3):
+    generators = generators or list(GENERATORS)
+    methods = methods or ["load_graph_from_jl"] + list(METHODS)
+    results = []
+    tmp_dir = tempfile.mkdtemp()
+
+    try:
+        for gen_name in generators:
+            for n in sizes:
+                if gen_name == "dense" and n > DENSE_MAX:
+                    continue
+                edges = GENERATORS[gen_name](n, seed = seed)
+                path = os.path.join(tmp_dir, f"{gen_name}_{n}.jl")
+                write_jl(path, edges)
+                g = Graph.load_graph_from_jl(path, use_cache = False)
+
+                for method in methods:
+                    if method == "load_graph_from_jl":
+                        fn = lambda: Graph.load_graph_from_jl(path, use_cache = False)
+                    else:
+                        fn = lambda: METHODS[method](g)
+                    seconds, _ = time_call(fn, repeat)
+                    results.append({
+                        "generator": gen_name,
+                        "n": n,
+                        "m": len(edges),
+                        "method": method,
+                        "seconds": seconds,
+                        "peak_bytes": peak_memory(fn),
+                    })
+                    print(f"  {gen_name:<10} n={n:<7} {method:<20} {seconds:9.4f} s")
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    return {
+        "python": platform.python_version(),
+        "seed": seed,
+        "repeat": repeat,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def compare_runs(old, new, threshold = 1.25, min_seconds = 1e-3):
+    # So 2 lần chạy theo khóa (generator, n, method); chậm hơn / tốn bộ nhớ hơn threshold lần -> hồi quy
+    def key(r):
+        return r["generator"], r["n"], r["method"]
+
+    before = {key(r): r for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        b = before.get(key(r))
+        if b is None:
+            continue
+        time_ratio = r["seconds"] / max(b["seconds"], min_seconds)
+        mem_ratio = r["peak_bytes"] / max(b["peak_bytes"], 1)
+        regressed = (r["seconds"] >= min_seconds and time_ratio > threshold) or mem_ratio > threshold
+        rows.append((key(r), b["seconds"], r["seconds"], time_ratio, mem_ratio, regressed))
+    return rows
+
+
+def bench_euler(sizes, repeat = 1):
+    rows = []
+    for n, m in sizes:
+        g = Graph.from_edges(eulerian_edges(n, m))
+        fleury, path = time_call(g.euler_fleury, repeat)
+        hierholzer, _ = time_call(g.euler_hierholzer, repeat)
+        rows.append((n, m, len(path) - 1, fleury, hierholzer))
+    return rows
+
+
+def bench_maze(sizes, seed = 0):
+    # generate_maze/findPath (bản gốc, đệ quy) so với generate_maze_grid/find_path_grid
+    rows = []
+    for n in sizes:
+        random.seed(seed)
+        try:
+            old_gen, _ = time_call(lambda: maze.generate_maze(n), 1)
+        except RecursionError:
+            old_gen = None
+
+        new_gen, (flat, width) = time_call(lambda: maze.generate_maze_grid(n, seed), 1)
+        new_solve, path = time_call(lambda: maze.find_path_grid(flat, width), 1)
+        # findPath chạy trên cùng mê cung (dạng list 2 chiều) để so sánh công bằng
+        grid = [list(row) for row in maze.grid_rows(flat, width)]
+        old_solve, _ = time_call(lambda: maze.findPath(grid), 1)
+        del grid
+        rows.append((n, old_gen, old_solve, new_gen, new_solve, len(path),
+                     peak_memory(lambda: maze.find_path_grid(*maze.generate_maze_grid(n, seed)))))
+    return rows
+
+
+def open_walls(grid, width, fraction, seed = 0):
+    # Đục thêm một phần tường trong để mê cung có vòng (nhiều đường đi)
+    rnd = random.Random(seed)
+    grid = bytearray(grid)
+    for r in range(1, width - 1):
+        for c in range(1 + r % 2, width - 1, 2):
+            if rnd.random() < fraction:
+                grid[r * width + c] = maze.OPEN
+    return grid
+
+
+def bench_maze_solvers(sizes, fractions = (0.0, 0.1, 0.5), seed = 0):
+    rows = []
+    for n in sizes:
+        base, width = maze.generate_maze_grid(n, seed)
+        for fraction in fractions:
+            grid = open_walls(base, width, fraction, seed) if fraction else base
+            for method in maze.SOLVERS:
+                stats = {}
+                seconds, path = time_call(lambda: maze.find_path_grid(grid, width, method = method, stats = stats), 1)
+                rows.append((n, fraction, method, seconds, stats["expanded"], len(path)))
+    return rows
+
+
+def bench_maze_io(sizes, seed = 0):
+    # Vòng ghi -> đọc -> giải -> ghi đường đi: file text như __main__ của maze.py so với file nhị phân
+    rows = []
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        for n in sizes:
+            grid, width = maze.generate_maze_grid(n, seed)
+            maze_txt = os.path.join(tmp_dir, "maze.txt")
+            path_txt = os.path.join(tmp_dir, "path.txt")
+            maze_bin = os.path.join(tmp_dir, "maze.bin")
+            path_bin = os.path.join(tmp_dir, "path.bin")
+
+            def text_round_trip():
+                maze.write_grid(maze_txt, grid, width)
+                with open(maze_txt, "r", encoding = "utf-8") as fr:
+                    rows_ = [list(line.rstrip("\n")) for line in fr]
+                path = maze.findPath(rows_)
+                with open(path_txt, "w", encoding = "utf-8") as fw:
+                    for cur in path:
+                        fw.write(f"{cur} -> ")
+
+            def packed_round_trip():
+                maze.write_packed_maze(maze_bin, grid, width)
+                packed = maze.read_packed_maze(maze_bin)
+                path = maze.find_path_grid(packed.unpack(), width)
+                packed.close()
+                maze.write_path_stream(path_bin, path, width)
+
+            def mmap_round_trip():
+                maze.write_packed_maze(maze_bin, grid, width)
+                packed = maze.read_packed_maze(maze_bin)
+                path = maze.find_path_grid(packed, width)
+                packed.close()
+                maze.write_path_stream(path_bin, path, width)
+
+            text_seconds, _ = time_call(text_round_trip, 1)
+            packed_seconds, _ = time_call(packed_round_trip, 1)
+            mmap_seconds, _ = time_call(mmap_round_trip, 1)
+            rows.append((n, text_seconds, os.path.getsize(maze_txt) + os.path.getsize(path_txt),
+                         packed_seconds, mmap_seconds, os.path.getsize(maze_bin) + os.path.getsize(path_bin)))
+    finally:
+        shutil.rmtree(tmp_dir)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest = "cmd", required = True)
+
+    p_load = sub.add_parser("load")
+    p_load.add_argument("path", nargs = "?", default = "g1.v2.jl")
+    p_load.add_argument("--scale", type = int, default = 1)
+    p_load.add_argument("--workers", type = int, nargs = "+", default = [1, 2, 4])
+
+    p_euler = sub.add_parser("euler")
+    p_euler.add_argument("--sizes", nargs = "+", default = ["1000:10000", "10000:100000", "100000:100000"],
+                         help = "n:m")
+
+    p_maze = sub.add_parser("maze")
+    p_maze.add_argument("--sizes", type = int, nargs = "+", default = [20, 30, 100, 1000])
+    p_maze.add_argument("--seed", type = int, default = 0)
+
+    p_solvers = sub.add_parser("solvers")
+    p_solvers.add_argument("--sizes", type = int, nargs = "+", default = [100, 1000])
+    p_solvers.add_argument("--fractions", type = float, nargs = "+", default = [0.0, 0.1, 0.5])
+    p_solvers.add_argument("--seed", type = int, default = 0)
+
+    p_maze_io = sub.add_parser("maze-io")
+    p_maze_io.add_argument("--sizes", type = int, nargs = "+", default = [100, 1000])
+    p_maze_io.add_argument("--seed", type = int, default = 0)
+
+    p_suite = sub.add_parser("suite")
+    p_suite.add_argument("--sizes", type = int, nargs = "+", default = [100, 1000, 10000])
+    p_suite.add_argument("--generators", nargs = "+", choices = list(GENERATORS))
+    p_suite.add_argument("--methods", nargs = "+", choices = ["load_graph_from_jl"] + list(METHODS))
+    p_suite.add_argument("--seed", type = int, default = 0)
+    p_suite.add_argument("--repeat", type = int, default = 3)
+    p_suite.add_argument("--out", default = "bench_results.json")
+
+    p_compare = sub.add_parser("compare")
+    p_compare.add_argument("old")
+    p_compare.add_argument("new")
+    p_compare.add_argument("--threshold", type = float, default = 1.25)
+
+    args = parser.parse_args()
+
+    if args.cmd == "load":
+        print(f"load_graph_from_jl({args.path}) x{args.scale}")
+        for label, seconds, edges in bench_load(args.path, args.workers, args.scale):
+            print(f"  {label:<14} {seconds:8.4f} s  ({edges} cạnh)")
+    elif args.cmd == "euler":
+        sizes = [tuple(int(x) for x in s.split(":")) for s in args.sizes]
+        for n, m, length, fleury, hierholzer in bench_euler(sizes):
+            print(f"  n={n:<7} m={m:<7} fleury {fleury:8.3f} s  hierholzer {hierholzer:8.3f} s")
+    elif args.cmd == "maze":
+        def fmt(seconds):
+            return f"{seconds:8.3f} s" if seconds is not None else "RecursionError"
+
+        for n, old_gen, old_solve, new_gen, new_solve, length, peak in bench_maze(args.sizes, args.seed):
+            print(f"  n={n:<6} cũ: sinh {fmt(old_gen)}, giải {fmt(old_solve)}"
+                  f"  | mới: sinh {new_gen:8.3f} s, giải {new_solve:8.3f} s"
+                  f"  (đường đi {length} ô, đỉnh bộ nhớ {peak / 2**20:.1f} MiB)")
+    elif args.cmd == "solvers":
+        for n, fraction, method, seconds, expanded, length in bench_maze_solvers(args.sizes, args.fractions, args.seed):
+            print(f"  n={n:<6} tường mở {fraction:4.2f}  {method:<14} {seconds:8.3f} s"
+                  f"  mở rộng {expanded:>9} ô  (đường đi {length} ô)")
+    elif args.cmd == "maze-io":
+        for n, text_seconds, text_bytes, packed_seconds, mmap_seconds, packed_bytes in bench_maze_io(args.sizes, args.seed):
+            print(f"  n={n:<6} text {text_seconds:8.3f} s ({text_bytes / 2**20:7.1f} MiB)"
+                  f"  | nhị phân {packed_seconds:8.3f} s, giải trên mmap {mmap_seconds:8.3f} s"
+                  f" ({packed_bytes / 2**20:7.2f} MiB)")
+    elif args.cmd == "suite":
+        report = run_suite(args.sizes, args.generators, args.methods, args.seed, args.repeat)
+        with open(args.out, "w", encoding = "utf-8") as f:
+            json.dump(report, f, indent = 2)
+        print(f"Đã ghi {len(report['results'])} kết quả vào {args.out}")
+    else:
+        with open(args.old, encoding = "utf-8") as f:
+            old = json.load(f)
+        with open(args.new, encoding = "utf-8") as f:
+            new = json.load(f)
+
+        regressions = 0
+        for (gen_name, n, method), before, after, time_ratio, mem_ratio, regressed in compare_runs(old, new, args.threshold):
+            flag = "HỒI QUY" if regressed else ""
+            regressions += regressed
+            print(f"  {gen_name:<10} n={n:<7} {method:<20} {before:9.4f} -> {after:9.4f} s"
+                  f"  x{time_ratio:5.2f}  mem x{mem_ratio:5.2f}  {flag}")
+        print(f"{regressions} hồi quy")
+        raise SystemExit(1 if regressions else 0)
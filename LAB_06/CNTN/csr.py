@@ -0,0 +1,386 @@
+from array import array
+from collections.abc import Mapping, Sequence
+
+
+class CSRStorage:
+    # Lưu đồ thị dạng CSR: đỉnh được đánh số 0..n-1 theo thứ tự tên,
+    # cung của đỉnh i nằm trong targets/weights[offsets[i]:offsets[i + 1]]
+    def __init__(self, names, directed, offsets, targets, weights, edge_u, edge_v, edge_w,
+                 in_deg = None, out_deg = None):
+        self.names = names
+        self.index = {v: i for i, v in enumerate(names)}
+        self.directed = directed
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.edge_u = edge_u
+        self.edge_v = edge_v
+        self.edge_w = edge_w
+        if out_deg is None:
+            self._build_degrees()
+        else:
+            self.in_deg = in_deg
+            self.out_deg = out_deg
+
+    def __getstate__(self):
+        # Mảng có thể là memoryview trên mmap (graph_cache) -> chép ra array khi pickle/deepcopy
+        state = dict(self.__dict__)
+        state.pop("_mmap", None)
+        for key, value in state.items():
+            if isinstance(value, memoryview):
+                state[key] = array(value.format, value)
+        return state
+
+    def _build_degrees(self):
+        # Chỉ mục bậc: out_deg từ offsets, in_deg đếm theo targets (đồ thị có hướng)
+        n = len(self.names)
+        offsets = self.offsets
+        self.out_deg = array("i", (offsets[i + 1] - offsets[i] for i in range(n)))
+        if self.directed:
+            in_deg = array("i", bytes(4 * n))
+            for t in self.targets:
+                in_deg[t] += 1
+            self.in_deg = in_deg
+        else:
+            self.in_deg = self.out_deg
+
+    @classmethod
+    def build(cls, edges, directed, vertices = None):
+        index = {}
+        names = []
+
+        def intern(x):
+            i = index.get(x)
+            if i is None:
+                i = index[x] = len(names)
+                names.append(x)
+            return i
+
+        if vertices is not None:
+            for x in vertices:
+                intern(x)
+
+        edge_u = array("i")
+        edge_v = array("i")
+        edge_w = array("d")
+        for u, v, w in edges:
+            edge_u.append(intern(u))
+            edge_v.append(intern(v))
+            edge_w.append(w)
+
+        # Đánh số lại theo thứ tự tên đã sắp xếp
+        order = sorted(range(len(names)), key = names.__getitem__)
+        remap = array("i", bytes(4 * len(names)))
+        for new_id, old_id in enumerate(order):
+            remap[old_id] = new_id
+        names = [names[i] for i in order]
+
+        for k in range(len(edge_u)):
+            a = remap[edge_u[k]]
+            b = remap[edge_v[k]]
+            if not directed and b < a:
+                a, b = b, a
+            edge_u[k] = a
+            edge_v[k] = b
+
+        offsets, targets, weights = cls._pack(len(names), edge_u, edge_v, edge_w, directed)
+        return cls(names, directed, offsets, targets, weights, edge_u, edge_v, edge_w)
+
+    @staticmethod
+    def _pack(n, edge_u, edge_v, edge_w, directed):
+        # Counting sort ổn định theo đỉnh nguồn -> giữ thứ tự thêm cạnh trong mỗi danh sách kề
+        counts = array("i", bytes(4 * (n + 1)))
+        for a in edge_u:
+            counts[a + 1] += 1
+        if not directed:
+            for b in edge_v:
+                counts[b + 1] += 1
+
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        offsets = array("i", counts)
+
+        m = offsets[n]
+        targets = array("i", bytes(4 * m))
+        weights = array("d", bytes(8 * m))
+        pos = array("i", offsets)
+
+        for k in range(len(edge_u)):
+            a = edge_u[k]
+            b = edge_v[k]
+            w = edge_w[k]
+            p = pos[a]
+            targets[p] = b
+            weights[p] = w
+            pos[a] = p + 1
+            if not directed:
+                p = pos[b]
+                targets[p] = a
+                weights[p] = w
+                pos[b] = p + 1
+
+        return offsets, targets, weights
+
+    def arcs(self, i):
+        names = self.names
+        return [(names[j], w) for j, w in self.arc_ids(i)]
+
+    def arc_ids(self, i):
+        targets = self.targets
+        weights = self.weights
+        return [(targets[k], weights[k]) for k in range(self.offsets[i], self.offsets[i + 1])]
+
+    def neighbor_ids(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def edge_count(self):
+        return len(self.edge_u)
+
+    def edge_at(self, k):
+        return self.edge_u[k], self.edge_v[k], self.edge_w[k]
+
+    def edge_ids(self):
+        return zip(self.edge_u, self.edge_v, self.edge_w)
+
+    def reverse_csr(self):
+        # CSR của các cung đi vào, tạo 1 lần khi cần và dùng chung cho mọi view đảo
+        rev = getattr(self, "_rev", None)
+        if rev is None:
+            rev = self._rev = build_reverse_csr(len(self.names), self.arc_ids)
+        return rev
+
+
+def build_reverse_csr(n, arc_ids, order = None):
+    # order: thứ tự duyệt đỉnh nguồn khi điền -> cung vào của mỗi đỉnh xếp theo thứ tự đó (mặc định theo id)
+    offsets = array("i", bytes(4 * (n + 1)))
+    for i in range(n):
+        for j, w in arc_ids(i):
+            offsets[j + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    sources = array("i", bytes(4 * offsets[n]))
+    weights = array("d", bytes(8 * offsets[n]))
+    pos = array("i", offsets)
+    for i in (range(n) if order is None else order):
+        for j, w in arc_ids(i):
+            sources[pos[j]] = i
+            weights[pos[j]] = w
+            pos[j] += 1
+    return offsets, sources, weights
+
+
+class StoreView:
+    # Đồ thị suy ra từ một CSRStorage khác: dùng chung tên đỉnh và mảng của đồ thị gốc,
+    # tạo view tốn O(1), danh sách kề được tính khi được hỏi
+    directed = False
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.names = parent.names
+        self.index = parent.index
+        self._edges = None
+        self._deg = None
+
+    def _source_rank(self):
+        # rank[i] = thứ tự xuất hiện lần đầu của i làm đỉnh nguồn, n nếu i không có cung ra
+        if getattr(self, "_rank", None) is None:
+            n = len(self.names)
+            rank = array("i", [n]) * n
+            order = []
+            for u, v, w in self.parent.edge_ids():
+                if rank[u] == n:
+                    rank[u] = len(order)
+                    order.append(u)
+            self._rank = rank
+            self._sources = order
+        return self._rank
+
+    def arcs(self, i):
+        names = self.names
+        return [(names[j], w) for j, w in self.arc_ids(i)]
+
+    def neighbor_ids(self, i):
+        return [j for j, w in self.arc_ids(i)]
+
+    def edge_at(self, k):
+        if self._edges is None:
+            self._edges = list(self.edge_ids())
+        return self._edges[k]
+
+    def reverse_csr(self):
+        rev = getattr(self, "_rev", None)
+        if rev is None:
+            rev = self._rev = build_reverse_csr(len(self.names), self.arc_ids)
+        return rev
+
+    def edge_count(self):
+        if self._edges is None:
+            self._edges = list(self.edge_ids())
+        return len(self._edges)
+
+    @property
+    def out_deg(self):
+        if self._deg is None:
+            self._deg = array("i", (len(self.arc_ids(i)) for i in range(len(self.names))))
+        return self._deg
+
+    @property
+    def in_deg(self):
+        return self.out_deg
+
+
+class ReversedView(StoreView):
+    # Đồ thị đảo của đồ thị có hướng: cung u -> v thành v -> u.
+    # Giữ cách làm cũ: duyệt đỉnh nguồn theo thứ tự xuất hiện lần đầu khi load, mỗi đỉnh theo thứ tự cung.
+    directed = True
+
+    def _arcs_in(self):
+        # CSR các cung vào của đồ thị gốc, điền theo thứ tự nguồn ở trên
+        rev = getattr(self, "_in", None)
+        if rev is None:
+            self._source_rank()
+            rev = self._in = build_reverse_csr(len(self.names), self.parent.arc_ids, self._sources)
+        return rev
+
+    def arc_ids(self, i):
+        offsets, sources, weights = self._arcs_in()
+        return [(sources[k], weights[k]) for k in range(offsets[i], offsets[i + 1])]
+
+    def neighbor_ids(self, i):
+        offsets, sources, weights = self._arcs_in()
+        return sources[offsets[i]:offsets[i + 1]]
+
+    def edge_count(self):
+        return self.parent.edge_count()
+
+    def edge_ids(self):
+        self._source_rank()
+        for u in self._sources:
+            for v, w in self.parent.arc_ids(u):
+                yield v, u, w
+
+    @property
+    def out_deg(self):
+        return self.parent.in_deg
+
+    @property
+    def in_deg(self):
+        return self.parent.out_deg
+
+
+class UndirectedView(StoreView):
+    # Đồ thị vô hướng nền của đồ thị có hướng, gộp u -> v và v -> u thành 1 cạnh.
+    # Giữ cách làm cũ (xem ReversedView): cung gặp đầu tiên của cặp (a, b) cho trọng số;
+    # thứ tự gặp quyết định edge_list và danh sách kề.
+    def arc_ids(self, i):
+        parent = self.parent
+        rank = self._source_rank()
+        offsets, sources, in_weights = parent.reverse_csr()
+
+        # j -> (thời điểm gặp cạnh (i, j), trọng số); thời điểm = (thứ tự đỉnh nguồn, vị trí cung trong nguồn)
+        first = {}
+        for p, (j, w) in enumerate(parent.arc_ids(i)):
+            if j not in first:
+                first[j] = ((rank[i], p), w)
+        for k in range(offsets[i], offsets[i + 1]):
+            j = sources[k]
+            if j == i:
+                continue
+            # Cung j -> i đầu tiên đứng trước mọi cung khác của j trong cặp này -> chỉ cần so thứ tự nguồn
+            when = (rank[j], 0)
+            if j not in first or when < first[j][0]:
+                first[j] = (when, in_weights[k])
+
+        result = []
+        for j, (when, w) in sorted(first.items(), key = lambda item: item[1][0]):
+            result.append((j, w))
+            if j == i:
+                result.append((i, w))
+        return result
+
+    def edge_ids(self):
+        self._source_rank()
+        seen = set()
+        for i in self._sources:
+            for j, w in self.parent.arc_ids(i):
+                pair = (i, j) if i <= j else (j, i)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                yield pair[0], pair[1], w
+
+
+class ComplementView(StoreView):
+    # Đồ thị bù (vô hướng, trọng số 1.0): kề của i = mọi đỉnh trừ i và các đỉnh kề với i
+    def _existing(self, i):
+        return set(self.parent.neighbor_ids(i))
+
+    def arc_ids(self, i):
+        existing = self._existing(i)
+        return [(j, 1.0) for j in range(len(self.names)) if j != i and j not in existing]
+
+    def neighbor_ids(self, i):
+        existing = self._existing(i)
+        return [j for j in range(len(self.names)) if j != i and j not in existing]
+
+    def edge_ids(self):
+        n = len(self.names)
+        for i in range(n):
+            existing = self._existing(i)
+            for j in range(i + 1, n):
+                if j not in existing:
+                    yield i, j, 1.0
+
+    def edge_count(self):
+        return sum(self.out_deg) // 2
+
+    @property
+    def out_deg(self):
+        if self._deg is None:
+            n = len(self.names)
+            self._deg = array("i", (n - 1 - len(self._existing(i) - {i}) for i in range(n)))
+        return self._deg
+
+
+class AdjListView(Mapping):
+    # Danh sách kề chỉ đọc, tạo list (v, w) khi được hỏi
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, u):
+        i = self._store.index.get(u)
+        if i is None:
+            return []
+        return self._store.arcs(i)
+
+    def __contains__(self, u):
+        return u in self._store.index
+
+    def __iter__(self):
+        return iter(self._store.names)
+
+    def __len__(self):
+        return len(self._store.names)
+
+
+class EdgeListView(Sequence):
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return self._store.edge_count()
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        u, v, w = self._store.edge_at(k)
+        names = self._store.names
+        return (names[u], names[v], w)
+
+    def __iter__(self):
+        names = self._store.names
+        for u, v, w in self._store.edge_ids():
+            yield (names[u], names[v], w)
@@ -0,0 +1,167 @@
+import hashlib
+import mmap
+import os
+import struct
+
+from csr import CSRStorage
+
+# File cache nhị phân của CSRStorage, đặt cạnh file .jl nguồn:
+#   header | tên đỉnh (mỗi tên: độ dài uint32 + utf-8) | mảng int32 | mảng float64
+# Khi đọc, các mảng là memoryview trỏ thẳng vào mmap, không copy.
+
+MAGIC = b"GCSR"
+VERSION = 2
+HEADER = struct.Struct("<4sIB3xqq20sqqqq")
+NAME_LEN = struct.Struct("<I")
+STAMP_OFFSET = struct.calcsize("<4sIB3x")
+
+
+def cache_path(pathFile, directed):
+    return f"{pathFile}.{'d' if directed else 'u'}.gcache"
+
+
+def file_digest(pathFile):
+    h = hashlib.sha1()
+    with open(pathFile, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+
+
+def _pad8(n):
+    return (-n) % 8
+
+
+def _pack_names(names):
+    # Tiền tố độ dài thay cho ký tự ngăn cách: tên đỉnh (khóa JSON) có thể chứa '\n'
+    parts = []
+    for name in names:
+        data = name.encode("utf-8")
+        parts.append(NAME_LEN.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def _unpack_names(blob):
+    names = []
+    pos = 0
+    while pos < len(blob):
+        if pos + NAME_LEN.size > len(blob):
+            raise ValueError("tên đỉnh bị cắt")
+        length, = NAME_LEN.unpack_from(blob, pos)
+        pos += NAME_LEN.size
+        if pos + length > len(blob):
+            raise ValueError("tên đỉnh bị cắt")
+        names.append(bytes(blob[pos:pos + length]).decode("utf-8"))
+        pos += length
+    return names
+
+
+def _file_size(n, m_edges, m_arcs, names_len):
+    ints = 4 * (3 * n + 1 + m_arcs + 2 * m_edges)
+    return HEADER.size + names_len + _pad8(names_len) + ints + _pad8(ints) + 8 * (m_arcs + m_edges)
+
+
+def write_cache(store, pathFile, directed):
+    st = os.stat(pathFile)
+    names_blob = _pack_names(store.names)
+    n = len(store.names)
+    m_edges = len(store.edge_u)
+    m_arcs = len(store.targets)
+
+    header = HEADER.pack(MAGIC, VERSION, int(directed), st.st_mtime_ns, st.st_size,
+                         file_digest(pathFile), n, m_edges, m_arcs, len(names_blob))
+
+    target = cache_path(pathFile, directed)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(names_blob)
+            f.write(b"\0" * _pad8(len(names_blob)))
+            for arr in (store.offsets, store.targets, store.edge_u, store.edge_v,
+                        store.out_deg, store.in_deg):
+                f.write(memoryview(arr).cast("B"))
+            f.write(b"\0" * _pad8(4 * (3 * n + 1 + m_arcs + 2 * m_edges)))
+            for arr in (store.weights, store.edge_w):
+                f.write(memoryview(arr).cast("B"))
+        os.replace(tmp, target)
+    except OSError:
+        # Cache chỉ để tăng tốc, không ghi được thì bỏ qua
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _touch_header(target, st):
+    # Nội dung không đổi, chỉ cập nhật mtime/size để lần sau khỏi hash lại
+    try:
+        with open(target, "r+b") as f:
+            f.seek(STAMP_OFFSET)
+            f.write(struct.pack("<qq", st.st_mtime_ns, st.st_size))
+    except OSError:
+        pass
+
+
+def load_cache(pathFile, directed):
+    target = cache_path(pathFile, directed)
+    try:
+        f = open(target, "rb")
+    except OSError:
+        return None
+
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+
+    (magic, version, cached_directed, mtime_ns, size, digest,
+     n, m_edges, m_arcs, names_len) = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION or bool(cached_directed) != directed:
+        mm.close()
+        return None
+
+    # mtime/size khớp -> dùng luôn; khác thì so hash nội dung (vd. sau git checkout)
+    st = os.stat(pathFile)
+    if (mtime_ns, size) != (st.st_mtime_ns, st.st_size):
+        if digest != file_digest(pathFile):
+            mm.close()
+            return None
+        _touch_header(target, st)
+
+    # File bị cắt/hỏng -> bỏ cache, đọc lại từ .jl
+    if len(mm) < _file_size(n, m_edges, m_arcs, names_len):
+        mm.close()
+        return None
+
+    buf = memoryview(mm)
+    pos = HEADER.size
+    try:
+        names = _unpack_names(buf[pos:pos + names_len])
+    except ValueError:
+        names = None
+    if names is None or len(names) != n:
+        buf.release()
+        mm.close()
+        return None
+    pos += names_len + _pad8(names_len)
+
+    def take(count, fmt, width):
+        nonlocal pos
+        view = buf[pos:pos + count * width].cast(fmt)
+        pos += count * width
+        return view
+
+    offsets = take(n + 1, "i", 4)
+    targets = take(m_arcs, "i", 4)
+    edge_u = take(m_edges, "i", 4)
+    edge_v = take(m_edges, "i", 4)
+    out_deg = take(n, "i", 4)
+    in_deg = take(n, "i", 4)
+    pos += _pad8(4 * (3 * n + 1 + m_arcs + 2 * m_edges))
+    weights = take(m_arcs, "d", 8)
+    edge_w = take(m_edges, "d", 8)
+
+    store = CSRStorage(names, directed, offsets, targets, weights, edge_u, edge_v, edge_w,
+                       in_deg = in_deg, out_deg = out_deg)
+    store._mmap = mm
+    return store
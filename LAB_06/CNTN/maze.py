@@ -1,4 +1,8 @@
+import heapq
+import mmap
 import random
+import struct
+from array import array
 from collections import deque
 
 DIRS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
@@ -43,11 +47,24 @@ def generate_maze(n):
     
     return ["".join(row) for row in grid]
 
-def findPath(grid):
+def findPath(grid, method = "bfs", stats = None):
     n = len(grid)
     sr, sc = 1, 1
     er, ec = n - 1, n - 2
     
+    if isinstance(grid, PackedGrid):
+        path = find_path_grid(grid, grid.width, method = method, stats = stats)
+        return None if path is None else path_cells(path, grid.width)
+    
+    if method != "bfs":
+        # Các cách khác chạy trên lưới phẳng, đổi kết quả về list (r, c)
+        width = len(grid[0])
+        flat = bytearray("".join("".join(row) for row in grid), "ascii")
+        path = find_path_grid(flat, width, sr * width + sc, er * width + ec, method, stats)
+        return None if path is None else path_cells(path, width)
+    
+    if stats is not None:
+        stats["expanded"] = 0
     if grid[sr][sc] == "#" or grid[er][ec] == "#":
         return None
     
@@ -59,6 +76,8 @@ def findPath(grid):
 
     while q:
         r, c = q.popleft()
+        if stats is not None:
+            stats["expanded"] += 1
         
         if r == er and c == ec:
             path = []
@@ -81,6 +100,434 @@ def findPath(grid):
     return None
                     
 
+
+# Bản cho mê cung lớn: lưới phẳng bytearray (2n+1) x (2n+1), ô (r, c) ở chỉ số r * width + c.
+# Không đệ quy, không tuple/dict -> n = 5000 chỉ tốn ~2 byte mỗi ô lưới.
+WALL = ord("#")
+OPEN = ord(" ")
+ROOT = 4    # ô bắt đầu, không có ô cha
+
+
+def generate_maze_grid(n, seed = None):
+    # DFS quay lui bằng vòng lặp. Trong lúc đào, ô đã thăm giữ mã hướng (0..3) về ô cha
+    # thay cho ngăn xếp; khi quay lui thì đổi thành " ".
+    rnd = random.Random(seed)
+    width = 2 * n + 1
+    grid = bytearray([WALL]) * (width * width)
+    steps = [dr * width + dc for dr, dc in DIRS]
+    back = (1, 0, 3, 2)     # hướng ngược của DIRS[d]
+
+    last = width - 2        # hàng/cột lẻ cuối cùng
+    cur = width + 1
+    grid[cur] = ROOT
+    while True:
+        r, c = divmod(cur, width)
+        options = []
+        if r > 1 and grid[cur - 2 * width] == WALL:
+            options.append(0)
+        if r < last and grid[cur + 2 * width] == WALL:
+            options.append(1)
+        if c > 1 and grid[cur - 2] == WALL:
+            options.append(2)
+        if c < last and grid[cur + 2] == WALL:
+            options.append(3)
+
+        if options:
+            d = options[int(rnd.random() * len(options))] if len(options) > 1 else options[0]
+            grid[cur + steps[d]] = OPEN
+            cur += 2 * steps[d]
+            grid[cur] = back[d]
+            continue
+
+        d = grid[cur]
+        grid[cur] = OPEN
+        if d == ROOT:
+            break
+        cur += 2 * steps[d]
+
+    grid[1] = OPEN
+    grid[width * width - 2] = OPEN
+    return grid, width
+
+
+SOLVERS = ("bfs", "bidirectional", "astar")
+
+
+def find_path_grid(grid, width, start = None, end = None, method = "bfs", stats = None):
+    # Tìm đường trên lưới phẳng, method thuộc SOLVERS. came[i] = 1 + hướng đi vào ô i (0 = chưa thăm)
+    # thay cho dict parent. Trả về array("i") chỉ số ô từ start tới end, hoặc None.
+    # stats (dict) nếu có sẽ nhận "expanded" = số ô đã lấy ra để mở rộng
+    height = len(grid) // width
+    start = width + 1 if start is None else start
+    end = (height - 1) * width + width - 2 if end is None else end
+    if method not in SOLVERS:
+        raise ValueError(f"method phải là một trong {SOLVERS}")
+    if stats is not None:
+        stats["expanded"] = 0
+    if grid[start] == WALL or grid[end] == WALL:
+        return None
+    if method == "bidirectional":
+        return _bidirectional_grid(grid, width, start, end, stats)
+    if method == "astar":
+        return _astar_grid(grid, width, start, end, stats)
+
+    steps = [dr * width + dc for dr, dc in DIRS]
+    size = len(grid)
+    came = bytearray(size)
+    came[start] = ROOT + 1
+    q = deque([start])
+    push = q.append
+    pop = q.popleft
+    expanded = 0
+
+    # Cùng thứ tự hướng với DIRS -> cùng đường đi với findPath
+    while q:
+        cur = pop()
+        expanded += 1
+        if cur == end:
+            break
+        c = cur % width
+        nxt = cur - width
+        if nxt >= 0 and grid[nxt] == OPEN and not came[nxt]:
+            came[nxt] = 1
+            push(nxt)
+        nxt = cur + width
+        if nxt < size and grid[nxt] == OPEN and not came[nxt]:
+            came[nxt] = 2
+            push(nxt)
+        nxt = cur - 1
+        if c > 0 and grid[nxt] == OPEN and not came[nxt]:
+            came[nxt] = 3
+            push(nxt)
+        nxt = cur + 1
+        if c < width - 1 and grid[nxt] == OPEN and not came[nxt]:
+            came[nxt] = 4
+            push(nxt)
+    else:
+        cur = None
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    if cur is None:
+        return None
+    return _trace(came, steps, start, end, 7)
+
+
+def _trace(came, steps, start, cur, mask, shift = 0):
+    # Lần ngược mã hướng (came[i] >> shift) & mask từ cur về start
+    path = array("i")
+    while cur != start:
+        path.append(cur)
+        cur -= steps[((came[cur] >> shift) & mask) - 1]
+    path.append(start)
+    path.reverse()
+    return path
+
+
+def _open_neighbors(grid, width, cur):
+    # (hướng, ô kề) theo thứ tự DIRS, chỉ các ô " " nằm trong lưới
+    c = cur % width
+    result = []
+    if cur - width >= 0 and grid[cur - width] == OPEN:
+        result.append((0, cur - width))
+    if cur + width < len(grid) and grid[cur + width] == OPEN:
+        result.append((1, cur + width))
+    if c > 0 and grid[cur - 1] == OPEN:
+        result.append((2, cur - 1))
+    if c < width - 1 and grid[cur + 1] == OPEN:
+        result.append((3, cur + 1))
+    return result
+
+
+def _bidirectional_grid(grid, width, start, end, stats):
+    # BFS từ 2 đầu, mỗi lượt mở rộng trọn 1 tầng của phía có biên nhỏ hơn.
+    # Mã hướng của phía start nằm ở 3 bit thấp của came, phía end ở 3 bit kế tiếp.
+    # Gặp nhau lần đầu trong 1 tầng -> mọi điểm gặp của tầng đó cho cùng độ dài ngắn nhất
+    steps = [dr * width + dc for dr, dc in DIRS]
+    came = bytearray(len(grid))
+    came[start] = ROOT + 1
+    came[end] |= (ROOT + 1) << 3
+    frontiers = [[start], [end]]
+    expanded = 0
+    meet = None
+
+    if start == end:
+        meet = (start, start)
+    while meet is None and frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        shift = 3 * side
+        other = 3 - shift
+        nxt_frontier = []
+        for cur in frontiers[side]:
+            expanded += 1
+            for d, nxt in _open_neighbors(grid, width, cur):
+                if (came[nxt] >> shift) & 7:
+                    continue
+                if (came[nxt] >> other) & 7:
+                    meet = (cur, nxt) if side == 0 else (nxt, cur)
+                    break
+                came[nxt] |= (d + 1) << shift
+                nxt_frontier.append(nxt)
+            if meet is not None:
+                break
+        frontiers[side] = nxt_frontier
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    if meet is None:
+        return None
+
+    # meet = (a, b): a thuộc cây phía start, b thuộc cây phía end, a kề b (hoặc a == b == start == end)
+    a, b = meet
+    path = _trace(came, steps, start, a, 7)
+    if b == a:
+        return path
+    while True:
+        path.append(b)
+        if b == end:
+            return path
+        b -= steps[((came[b] >> 3) & 7) - 1]
+
+
+def _astar_grid(grid, width, start, end, stats):
+    # A* với heuristic Manhattan (nhất quán trên lưới 4 hướng -> ô lấy ra lần đầu đã tối ưu).
+    # Heap chứa (f, -g, ô, mã hướng); cùng f thì ưu tiên ô sâu hơn
+    steps = [dr * width + dc for dr, dc in DIRS]
+    er, ec = divmod(end, width)
+    came = bytearray(len(grid))
+    r, c = divmod(start, width)
+    heap = [(abs(r - er) + abs(c - ec), 0, start, ROOT + 1)]
+    expanded = 0
+    found = False
+
+    while heap:
+        f, neg_g, cur, code = heapq.heappop(heap)
+        if came[cur]:
+            continue
+        came[cur] = code
+        expanded += 1
+        if cur == end:
+            found = True
+            break
+        g = 1 - neg_g
+        for d, nxt in _open_neighbors(grid, width, cur):
+            if not came[nxt]:
+                r, c = divmod(nxt, width)
+                heapq.heappush(heap, (g + abs(r - er) + abs(c - ec), -g, nxt, d + 1))
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    if not found:
+        return None
+    return _trace(came, steps, start, end, 7)
+
+
+def grid_rows(grid, width):
+    for i in range(0, len(grid), width):
+        yield grid[i:i + width].decode("ascii")
+
+
+def write_grid(path, grid, width):
+    with open(path, "wb") as fw:
+        for i in range(0, len(grid), width):
+            fw.write(grid[i:i + width])
+            fw.write(b"\n")
+
+
+def read_grid(path):
+    grid = bytearray()
+    width = 0
+    with open(path, "rb") as fr:
+        for line in fr:
+            line = line.rstrip(b"\r\n")
+            width = len(line)
+            grid += line
+    return grid, width
+
+
+def path_cells(path, width):
+    return [divmod(i, width) for i in path]
+
+
+UNREACHED = -1
+
+
+def distance_field(grid, width, sources = None, cutoff = None):
+    # BFS theo tầng từ nhiều nguồn cùng lúc trên lưới phẳng (bytearray hoặc PackedGrid).
+    # Trả về array("i"): khoảng cách (số bước theo DIRS) tới nguồn gần nhất,
+    # UNREACHED cho tường, ô không tới được hoặc xa hơn cutoff. Mặc định nguồn là ô (1, 1) như findPath
+    size = len(grid)
+    sources = [width + 1] if sources is None else sources
+    moves = [(dr * width + dc, dc) for dr, dc in DIRS]
+    dist = array("i", [UNREACHED]) * size
+
+    frontier = []
+    for s in sources:
+        if grid[s] == OPEN and dist[s] == UNREACHED:
+            dist[s] = 0
+            frontier.append(s)
+
+    d = 0
+    while frontier and (cutoff is None or d < cutoff):
+        d += 1
+        nxt_frontier = []
+        push = nxt_frontier.append
+        for cur in frontier:
+            c = cur % width
+            for step, dc in moves:
+                if (dc < 0 and c == 0) or (dc > 0 and c == width - 1):
+                    continue
+                nxt = cur + step
+                if 0 <= nxt < size and dist[nxt] == UNREACHED and grid[nxt] == OPEN:
+                    dist[nxt] = d
+                    push(nxt)
+        frontier = nxt_frontier
+    return dist
+
+
+def farthest_cell(dist):
+    best = max(dist)
+    return (dist.index(best), best) if best > UNREACHED else (None, UNREACHED)
+
+
+def hardest_pair(grid, width, source = None):
+    # Quét 2 lần: ô xa nhất a từ source, rồi ô xa nhất b từ a.
+    # Với mê cung hoàn hảo (cây) d(a, b) là đường đi dài nhất; có vòng thì là cận dưới
+    source = width + 1 if source is None else source
+    a, _ = farthest_cell(distance_field(grid, width, [source]))
+    if a is None:
+        return None
+    b, d = farthest_cell(distance_field(grid, width, [a]))
+    return a, b, d
+
+# File nhị phân cho mê cung lớn (ghi/đọc qua mmap):
+#   mê cung: header | 1 bit mỗi ô theo hàng, bit cao trước, 1 = "#"
+#   đường đi: header | 2 bit mỗi bước (chỉ số trong DIRS), 4 bước mỗi byte, bit cao trước
+MAZE_MAGIC = b"MAZB"
+PATH_MAGIC = b"MPTH"
+MAZE_HEADER = struct.Struct("<4sIII")     # magic, version, height, width
+PATH_HEADER = struct.Struct("<4sIIqq")    # magic, version, width, ô bắt đầu, số bước
+FORMAT_VERSION = 1
+PACK_CHUNK = 1 << 23                      # số ô mỗi lần đóng gói
+
+
+class PackedGrid:
+    # Lưới 1 bit/ô trên buffer (mmap hoặc bytes), đọc giống bytearray của generate_maze_grid:
+    # grid[i] trả về WALL / OPEN -> find_path_grid chạy thẳng trên buffer, không giải nén
+    def __init__(self, bits, height, width, mm = None):
+        self.bits = bits
+        self.height = height
+        self.width = width
+        self._mmap = mm
+
+    def __len__(self):
+        return self.height * self.width
+
+    def __getitem__(self, i):
+        return WALL if (self.bits[i >> 3] >> (7 - (i & 7))) & 1 else OPEN
+
+    def unpack(self):
+        # Giải nén cả lưới ra bytearray (nhanh hơn khi cần đọc nhiều lần)
+        grid = bytearray()
+        size = len(self)
+        for pos in range(0, size, PACK_CHUNK):
+            count = min(PACK_CHUNK, size - pos)
+            chunk = self.bits[pos >> 3:(pos + count + 7) >> 3]
+            text = bin(int.from_bytes(chunk, "big") | (1 << 8 * len(chunk)))[3:3 + count]
+            grid += text.encode("ascii").translate(_BITS_TO_CELLS)
+        return grid
+
+    def close(self):
+        if self._mmap is not None:
+            self.bits.release()
+            self.bits = None
+            self._mmap.close()
+            self._mmap = None
+
+
+_CELLS_TO_BITS = bytes.maketrans(b"# ", b"10")
+_BITS_TO_CELLS = bytes.maketrans(b"10", b"# ")
+
+
+def _pack_bits(cells):
+    # b"#  # ..." -> bytes, bit cao trước; byte cuối được đệm 0
+    count = len(cells)
+    if count == 0:
+        return b""
+    pad = -count % 8
+    value = int(cells.translate(_CELLS_TO_BITS) + b"0" * pad, 2)
+    return value.to_bytes((count + pad) // 8, "big")
+
+
+def write_packed_maze(path, grid, width):
+    size = len(grid)
+    height = size // width
+    total = MAZE_HEADER.size + (size + 7) // 8
+    with open(path, "w+b") as f:
+        f.truncate(total)
+        with mmap.mmap(f.fileno(), total) as mm:
+            MAZE_HEADER.pack_into(mm, 0, MAZE_MAGIC, FORMAT_VERSION, height, width)
+            pos = MAZE_HEADER.size
+            for start in range(0, size, PACK_CHUNK):
+                packed = _pack_bits(bytes(grid[start:start + PACK_CHUNK]))
+                mm[pos:pos + len(packed)] = packed
+                pos += len(packed)
+
+
+def read_packed_maze(path):
+    # Trả về PackedGrid trên mmap chỉ đọc; gọi close() khi xong
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    magic, version, height, width = MAZE_HEADER.unpack_from(mm, 0)
+    if magic != MAZE_MAGIC or version != FORMAT_VERSION:
+        mm.close()
+        raise ValueError(f"{path}: không phải file mê cung nhị phân")
+    bits = memoryview(mm)[MAZE_HEADER.size:MAZE_HEADER.size + (height * width + 7) // 8]
+    return PackedGrid(bits, height, width, mm)
+
+
+def write_path_stream(path, cells, width):
+    # cells: dãy chỉ số ô liền kề nhau (kết quả của find_path_grid)
+    steps = {dr * width + dc: d for d, (dr, dc) in enumerate(DIRS)}
+    moves = len(cells) - 1 if len(cells) else 0
+    start = cells[0] if len(cells) else -1
+    with open(path, "wb") as f:
+        f.write(PATH_HEADER.pack(PATH_MAGIC, FORMAT_VERSION, width, start, moves))
+        out = bytearray()
+        byte = 0
+        for k in range(moves):
+            byte = (byte << 2) | steps[cells[k + 1] - cells[k]]
+            if k & 3 == 3:
+                out.append(byte)
+                byte = 0
+                if len(out) >= 1 << 16:
+                    f.write(out)
+                    out.clear()
+        if moves & 3:
+            out.append(byte << 2 * (4 - (moves & 3)))
+        f.write(out)
+
+
+def read_path_stream(path):
+    # Đọc lại file đường đi qua mmap -> array("i") chỉ số ô, width
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+            magic, version, width, start, moves = PATH_HEADER.unpack_from(mm, 0)
+            if magic != PATH_MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path}: không phải file đường đi nhị phân")
+            cells = array("i")
+            if start < 0:
+                return cells, width
+            steps = [dr * width + dc for dr, dc in DIRS]
+            cur = start
+            cells.append(cur)
+            pos = PATH_HEADER.size
+            for k in range(moves):
+                d = (mm[pos + (k >> 2)] >> (6 - 2 * (k & 3))) & 3
+                cur += steps[d]
+                cells.append(cur)
+            return cells, width
+
 if __name__ == "__main__":
     n = int(input())
 
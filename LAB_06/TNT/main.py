@@ -1,47 +1,257 @@
 # %%
 import json
+import os
 import re
+import heapq
+import hashlib
+import io
+import shutil
+import struct
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict, Counter
+
+HOUR_RE = re.compile(r"(\d+)\s*hour")
+MINUTE_RE = re.compile(r"(\d+)\s*minute")
+BUSINESS_RE = re.compile(r"(\d+)\s*business")
+ECONOMY_RE = re.compile(r"(\d+)\s*economy")
+
+
+def duration_minutes(duration_str):
+    s = duration_str.lower()
+    h_match = HOUR_RE.search(s)
+    m_match = MINUTE_RE.search(s)
+    
+    hours = int(h_match.group(1)) if h_match else 0
+    minutes = int(m_match.group(1)) if m_match else 0
+    
+    return hours * 60 + minutes
+
+
+class FlightTable:
+    # Bảng dạng cột song song với FlightGraph.edges: parse chuỗi 1 lần lúc load,
+    # các phép min/max/top-k/lọc/gom nhóm chạy trên mảng số nguyên
+    COLUMNS = ("minutes", "business", "economy", "seats")
+    
+    def __init__(self):
+        self.minutes = array("i")
+        self.business = array("i")
+        self.economy = array("i")
+        self.seats = array("i")
+        self.model_codes = array("i")   # chỉ số trong self.models
+        self.models = []
+        self._model_ids = {}
+    
+    def __len__(self):
+        return len(self.minutes)
+    
+    def append(self, info):
+        model, capacity, duration = info
+        
+        code = self._model_ids.get(model)
+        if code is None:
+            code = self._model_ids[model] = len(self.models)
+            self.models.append(model)
+        
+        b_match = BUSINESS_RE.search(capacity)
+        e_match = ECONOMY_RE.search(capacity)
+        business = int(b_match.group(1)) if b_match else 0
+        economy = int(e_match.group(1)) if e_match else 0
+        
+        self.minutes.append(duration_minutes(duration))
+        self.business.append(business)
+        self.economy.append(economy)
+        self.seats.append(business + economy)
+        self.model_codes.append(code)
+    
+    def model(self, i):
+        return self.models[self.model_codes[i]]
+    
+    def argmax(self, column):
+        col = getattr(self, column)
+        return max(range(len(col)), key = col.__getitem__)
+    
+    def argmin(self, column):
+        col = getattr(self, column)
+        return min(range(len(col)), key = col.__getitem__)
+    
+    def top_k(self, column, k, largest = True):
+        col = getattr(self, column)
+        pick = heapq.nlargest if largest else heapq.nsmallest
+        return pick(k, range(len(col)), key = col.__getitem__)
+    
+    def filter(self, model = None, **bounds):
+        # bounds: min_<cột> / max_<cột>, vd. filter(min_minutes = 600, model = "Airbus A330")
+        indices = range(len(self))
+        if model is not None:
+            code = self._model_ids.get(model)
+            if code is None:
+                return []
+            codes = self.model_codes
+            indices = [i for i in indices if codes[i] == code]
+        
+        for key, value in bounds.items():
+            kind, column = key.split("_", 1)
+            col = getattr(self, column)
+            if kind == "min":
+                indices = [i for i in indices if col[i] >= value]
+            elif kind == "max":
+                indices = [i for i in indices if col[i] <= value]
+            else:
+                raise ValueError(f"Unknown filter: {key}")
+        return list(indices)
+    
+    def group_by_model(self, column = "minutes"):
+        # model -> (số chuyến, tổng, nhỏ nhất, lớn nhất) của cột
+        col = getattr(self, column)
+        stats = {}
+        for code, value in zip(self.model_codes, col):
+            entry = stats.get(code)
+            if entry is None:
+                stats[code] = [1, value, value, value]
+            else:
+                entry[0] += 1
+                entry[1] += value
+                if value < entry[2]:
+                    entry[2] = value
+                if value > entry[3]:
+                    entry[3] = value
+        return {self.models[code]: tuple(entry) for code, entry in stats.items()}
+
+def int_array():
+    return array("i")
+
+
+class EdgeView:
+    # self.edges của FlightGraph: lưu cặp id đỉnh trong 2 mảng int, trả ra cặp tên khi đọc
+    def __init__(self, graph):
+        self.graph = graph
+    
+    def __len__(self):
+        return len(self.graph.src)
+    
+    def __getitem__(self, i):
+        g = self.graph
+        return g.vertex_names[g.src[i]], g.vertex_names[g.dst[i]]
+    
+    def __iter__(self):
+        names = self.graph.vertex_names
+        for a, b in zip(self.graph.src, self.graph.dst):
+            yield names[a], names[b]
+    
+    def __contains__(self, route):
+        return route in self.graph.route_index
+
 
 class FlightGraph:
     def __init__(self, file_path):
-        self.vertices = []
-        self.edges = []
+        # Bảng id đỉnh: vertex_names[id] = tên, vertex_id[tên] = id
+        self.vertex_names = []
+        self.vertex_id = {}
+        self.vertices = self.vertex_names
+        self._vertices_sorted = False
+        
+        # Cạnh thứ i: src[i] -> dst[i] (id đỉnh), bậc cập nhật ngay khi thêm cạnh
+        self.src = array("i")
+        self.dst = array("i")
+        self.deg_out = array("i")
+        self.deg_in = array("i")
+        self.edges = EdgeView(self)
         self.weights = []
         self.file_path = file_path
         
+        # Chỉ mục băm -> danh sách chỉ số chuyến bay trong self.edges / self.weights
+        self.route_index = defaultdict(int_array)    # (u, v)
+        self.code_index = defaultdict(int_array)     # mã máy bay info[0]
+        self.source_index = defaultdict(int_array)   # u
+        self.dest_index = defaultdict(int_array)     # v
+        
+        self.table = FlightTable()
+        
         self.load_data()
         
     def load_data(self):
-        with open(self.file_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                data = json.loads(line)
-                (route, info), = data.items()
-                
-                # Tách đỉnh
-                u_raw, v_raw = route.split(",", 1)
-                u = u_raw.strip()
-                v = v_raw.strip()
-                
-                self.vertices.append(u)
-                self.vertices.append(v)
-                
-                self.edges.append((u, v))
-                self.weights.append(info)
-                
+        for line_no, u, v, info in iter_flights(self.file_path):
+            self.add_flight(u, v, info)
+    
+    def intern_vertex(self, name):
+        i = self.vertex_id.get(name)
+        if i is None:
+            i = self.vertex_id[name] = len(self.vertex_names)
+            self.vertex_names.append(name)
+            self.deg_out.append(0)
+            self.deg_in.append(0)
+        return i
+    
+    def add_flight(self, u, v, info):
+        i = len(self.src)
+        
+        a = self.intern_vertex(u)
+        b = self.intern_vertex(v)
+        self.src.append(a)
+        self.dst.append(b)
+        self.deg_out[a] += 1
+        self.deg_in[b] += 1
+        
+        self.weights.append(info)
+        
+        self.route_index[(u, v)].append(i)
+        self.code_index[info[0]].append(i)
+        self.source_index[u].append(i)
+        self.dest_index[v].append(i)
+        
+        self.table.append(info)
+    
+    def has_route(self, u, v):
+        return (u, v) in self.route_index
+    
+    def find_flights(self, src = None, dest = None, code = None):
+        # Trả về mọi chuyến (u, v, info) khớp điều kiện; lấy danh sách ứng viên ngắn nhất từ các chỉ mục
+        candidates = []
+        if src is not None and dest is not None:
+            candidates.append(self.route_index.get((src, dest), ()))
+        elif src is not None:
+            candidates.append(self.source_index.get(src, ()))
+        elif dest is not None:
+            candidates.append(self.dest_index.get(dest, ()))
+        if code is not None:
+            candidates.append(self.code_index.get(code, ()))
+        
+        indices = min(candidates, key = len) if candidates else range(len(self.edges))
+        
+        result = []
+        for i in indices:
+            u, v = self.edges[i]
+            info = self.weights[i]
+            if (src is None or u == src) and (dest is None or v == dest) and (code is None or info[0] == code):
+                result.append((u, v, info))
+        return result
+
     def check_duplicates_vertices(self):
-        original_count = len(self.vertices)
-        unique_vertices = sorted(list(set(self.vertices)))
+        # Đỉnh đã được gộp khi load; trước khi gộp mỗi cạnh góp 2 tên đỉnh
+        original_count = len(self.vertices) if self._vertices_sorted else 2 * len(self.edges)
         
-        self.vertices = unique_vertices
+        self.vertices = sorted(self.vertex_names)
+        self._vertices_sorted = True
         
         print(f"Original vertex count: {original_count}")
         print(f"Unique vertex count: {len(self.vertices)}")
         
-    def check_duplicates_flights(self):
+    def check_duplicates_flights(self, streaming = False, memory_budget = None):
+        if streaming:
+            # Đọc thẳng file JSONL, bộ nhớ bị chặn bởi memory_budget
+            budget = DEFAULT_MEMORY_BUDGET if memory_budget is None else memory_budget
+            found = False
+            for u, v, info, lines in find_duplicate_flights(self.file_path, budget):
+                if not found:
+                    print("Duplicate flights found:")
+                    found = True
+                print((u, v, info), "lines:", lines)
+            if not found:
+                print("No duplicate flights found.")
+            return
+        
         seen = set()
         duplicates = []
         
@@ -65,47 +275,23 @@ class FlightGraph:
             print("No duplicate flights found.")
             
     def get_flight_info(self, src, dest):
-        found = False
-        for i, (u, v) in enumerate(self.edges):
-            if u == src and v == dest:
-                info = self.weights[i]
-                print("Tìm thấy: ")
-                print(f"Flight from {src} to {dest}")
-                print(f"Chuyến bay: {info[0]}")
-                print(f"Số ghế: {info[1]}")
-                print(f"Thời gian bay: {info[2]}")
-                found = True
-                break
-        if not found:
+        indices = self.route_index.get((src, dest))
+        if indices:
+            info = self.weights[indices[0]]
+            print("Tìm thấy: ")
+            print(f"Flight from {src} to {dest}")
+            print(f"Chuyến bay: {info[0]}")
+            print(f"Số ghế: {info[1]}")
+            print(f"Thời gian bay: {info[2]}")
+        else:
             print(f"No flight found from {src} to {dest}.")
 
     def parse_time(self, duration_str):
-        s= duration_str.lower()
-        h_match  = re.search(r"(\d+)\s*hour", s)
-        m_match  = re.search(r"(\d+)\s*minute", s)
-        
-        hours = int(h_match.group(1)) if h_match else 0
-        minutes = int(m_match.group(1)) if m_match else 0
-        
-        return hours * 60 + minutes
+        return duration_minutes(duration_str)
     
     def find_longest_shortest_flight(self):
-        idx_longest = -1
-        idx_shortest = -1
-        
-        max_duration = -1
-        min_duration = float('inf')
-        
-        for i, info in enumerate(self.weights):
-            duration = info[2]
-            total_minutes = self.parse_time(duration)
-            
-            if total_minutes > max_duration:
-                max_duration = total_minutes
-                idx_longest = i
-            if total_minutes < min_duration:
-                min_duration = total_minutes
-                idx_shortest = i
+        idx_longest = self.table.argmax("minutes")
+        idx_shortest = self.table.argmin("minutes")
                 
         print("\nLongest flight:")
         u, v = self.edges[idx_longest]
@@ -120,23 +306,17 @@ class FlightGraph:
         print(f"Flight: {info[0]}, Seats: {info[1]}, Duration: {info[2]}")
 
     def find_flight_by_code(self, flight_code):
-        for i, info in enumerate(self.weights):
-            if info[0] == flight_code:
-                u, v = self.edges[i]
-                print(f"Flight {flight_code} found from {u} to {v}")
-                return
+        indices = self.code_index.get(flight_code)
+        if indices:
+            u, v = self.edges[indices[0]]
+            print(f"Flight {flight_code} found from {u} to {v}")
+            return
             
         print(f"Flight {flight_code} not found.")
 
     # Bổ đề bắt tay: Tổng số bậc = 2 * số cạnh
     def verify_handshaking_lemma(self):
-        degree = {v: 0 for v in self.vertices}
-        
-        for u, v in self.edges:
-            degree[u] += 1
-            degree[v] += 1
-        
-        total_degree = sum(degree.values())
+        total_degree = sum(self.deg_out) + sum(self.deg_in)
         total_edges = len(self.edges)
         print(f"Total degree: {total_degree}, Total edges: {total_edges}")
         
@@ -146,21 +326,15 @@ class FlightGraph:
             print("Handshaking lemma not verified.")
     
     def print_degrees(self):
-        deg_in = {v: 0 for v in self.vertices}
-        deg_out = {v: 0 for v in self.vertices}
-        
-        for u, v in self.edges:
-            deg_out[u] += 1
-            deg_in[v] += 1
-        
         for v in self.vertices:
-            print(f"Vertex: {v}, In-degree: {deg_in[v]}, Out-degree: {deg_out[v]}")
+            i = self.vertex_id[v]
+            print(f"Vertex: {v}, In-degree: {self.deg_in[i]}, Out-degree: {self.deg_out[i]}")
     
     def is_valid_walk(self, path_list):
         for i in range(len(path_list) - 1):
             u = path_list[i]
             v = path_list[i + 1]
-            if (u, v) not in self.edges:
+            if not self.has_route(u, v):
                 print(f"Invalid walk: No edge from {u} to {v}")
                 return False
         print("Valid walk.")
@@ -168,17 +342,17 @@ class FlightGraph:
     
     # Không có cạnh trùng
     def is_valid_trail(self, path_list):
-        path_edges = []
+        path_edges = set()
         for i in range(len(path_list) - 1):
             u = path_list[i]
             v = path_list[i + 1]
-            if (u, v) not in self.edges:
+            if not self.has_route(u, v):
                 print(f"Invalid trail: No edge from {u} to {v}")
                 return False
             if (u, v) in path_edges:
                 print(f"Invalid trail: Edge from {u} to {v} is repeated")
                 return False
-            path_edges.append((u, v))
+            path_edges.add((u, v))
         
         print("Valid trail.")
         return True
@@ -233,14 +407,336 @@ class FlightGraph:
         print("Valid simple cycle.")
         return True
     
+    # Kiểm tra hàng loạt hành trình, không in; mỗi kết quả là dict của classify_path
+    def classify_paths(self, paths, workers = None, chunks_per_worker = 4):
+        routes = self.route_index.keys()
+        if not workers or workers <= 1 or len(paths) < 2:
+            return [classify_path(routes, p) for p in paths]
+        
+        size = -(-len(paths) // (workers * chunks_per_worker))
+        chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+        routes = frozenset(routes)
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            parts = pool.map(_classify_chunk, [routes] * len(chunks), chunks)
+            return [r for part in parts for r in part]
+    
     def is_subgraph(self, other_graph):
         for u, v in self.edges:
-            if (u, v) not in other_graph.edges:
+            if not other_graph.has_route(u, v):
                 print(f"Not a subgraph: Edge from {u} to {v} not in other graph")
                 return False
         print("Is a subgraph.")
         return True
     
+    def flight_multiset(self):
+        return Counter((u, v, tuple(info)) for (u, v), info in zip(self.edges, self.weights))
+    
+    # So sánh self (bản cũ) với other_graph (bản mới), O(E1 + E2)
+    def compare(self, other_graph):
+        return compare_flight_multisets(self.flight_multiset(), other_graph.flight_multiset())
+    
+
+def parse_flight(line):
+    # 1 dòng JSONL {"u, v": info} -> (u, v, info)
+    data = json.loads(line)
+    (route, info), = data.items()
+    
+    # Tách đỉnh
+    u_raw, v_raw = route.split(",", 1)
+    return u_raw.strip(), v_raw.strip(), info
+
+
+def iter_flights(file_path):
+    # Đọc từng dòng JSONL -> (số dòng, u, v, info)
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line_no, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            yield (line_no, *parse_flight(line))
+
+
+def iter_flight_offsets(file_path):
+    # Như iter_flights nhưng kèm vị trí byte đầu dòng -> đọc lại đúng 1 dòng bằng read_flight_at
+    with open(file_path, 'rb') as file:
+        offset = 0
+        for line_no, raw in enumerate(file, 1):
+            line = raw.strip()
+            if line:
+                yield (line_no, offset, *parse_flight(line))
+            offset += len(raw)
+
+
+def read_flight_at(file, offset):
+    file.seek(offset)
+    u, v, info = parse_flight(file.readline())
+    return u, v, tuple(info)
+
+
+def compare_flight_multisets(old, new):
+    # old, new: Counter (u, v, info) -> số lần xuất hiện
+    old_routes = Counter()
+    new_routes = Counter()
+    for (u, v, info), count in old.items():
+        old_routes[(u, v)] += count
+    for (u, v, info), count in new.items():
+        new_routes[(u, v)] += count
+    
+    removed = old - new
+    added = new - old
+    
+    # Tuyến có ở cả 2 bản, mất chuyến bay cũ và có chuyến bay mới -> (info cũ, info mới)
+    removed_by_route = defaultdict(list)
+    added_by_route = defaultdict(list)
+    for (u, v, info) in removed:
+        removed_by_route[(u, v)].append(info)
+    for (u, v, info) in added:
+        added_by_route[(u, v)].append(info)
+    changed = {route: (infos, added_by_route[route])
+               for route, infos in removed_by_route.items() if route in added_by_route}
+    
+    # Cùng chuyến bay nhưng số lần xuất hiện khác nhau
+    multiplicity = {flight: (old[flight], new[flight])
+                    for flight in old.keys() & new.keys() if old[flight] != new[flight]}
+    
+    return {
+        "is_subgraph": all(route in new_routes for route in old_routes),
+        "is_equal": old == new,
+        "added": sorted(added.items()),
+        "removed": sorted(removed.items()),
+        "changed": changed,
+        "multiplicity": multiplicity,
+    }
+
+
+def stream_flight_diff(old_path, new_path):
+    # Chỉ giữ bản cũ trong bộ nhớ, đọc bản mới theo dòng.
+    # Sinh ra ("added", line_no, u, v, info) khi đọc file mới, cuối cùng là các ("removed", None, u, v, info).
+    remaining = Counter((u, v, tuple(info)) for _, u, v, info in iter_flights(old_path))
+    
+    for line_no, u, v, info in iter_flights(new_path):
+        flight = (u, v, tuple(info))
+        if remaining[flight] > 0:
+            remaining[flight] -= 1
+        else:
+            yield "added", line_no, u, v, flight[2]
+    
+    for (u, v, info), count in remaining.items():
+        for _ in range(count):
+            yield "removed", None, u, v, info
+
+
+# Thứ tự từ mạnh tới yếu; hành trình khép kín (đầu = cuối) xét nhóm chu trình trước
+PATH_KINDS = ("simple_cycle", "cycle", "closed_walk", "path", "trail", "walk")
+
+
+def classify_path(routes, path_list):
+    # 1 lượt qua hành trình: routes là tập (u, v) có chuyến bay, tra băm O(1) mỗi bước.
+    # Trả về dict cờ của từng tính chất như is_valid_*, "kind" = tính chất mạnh nhất (None nếu không là walk)
+    result = dict.fromkeys(PATH_KINDS, False)
+    result["kind"] = None
+    result["reason"] = None
+    
+    used_edges = set()
+    seen = set()
+    repeated_edge = False
+    repeated_vertex = False    # lặp đỉnh trong path_list[:-1]
+    
+    for i in range(len(path_list) - 1):
+        u = path_list[i]
+        v = path_list[i + 1]
+        if (u, v) not in routes:
+            result["reason"] = f"No edge from {u} to {v}"
+            return result
+        if not repeated_edge:
+            if (u, v) in used_edges:
+                repeated_edge = True
+                result["reason"] = f"Edge from {u} to {v} is repeated"
+            used_edges.add((u, v))
+        if u in seen:
+            repeated_vertex = True
+        seen.add(u)
+    
+    closed = len(path_list) > 0 and path_list[0] == path_list[-1]
+    result["walk"] = True
+    result["trail"] = not repeated_edge
+    result["path"] = result["trail"] and not repeated_vertex and (not path_list or path_list[-1] not in seen)
+    result["closed_walk"] = closed
+    result["cycle"] = closed and result["trail"]
+    result["simple_cycle"] = result["cycle"] and not repeated_vertex
+    
+    for kind in PATH_KINDS:
+        if result[kind]:
+            result["kind"] = kind
+            break
+    return result
+
+
+def _classify_chunk(routes, paths):
+    return [classify_path(routes, p) for p in paths]
+
+
+# Phát hiện chuyến bay trùng theo luồng: mỗi bản ghi -> (digest 16 byte, số dòng, vị trí byte).
+# Ngân sách tính theo số bản ghi giữ trong RAM; vượt thì đổ ra các file bucket trên đĩa
+# (theo byte đầu digest) rồi xử lý từng bucket riêng. Bản ghi thật được đọc lại bằng seek theo vị trí.
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+DIGEST_SIZE = 16
+ENTRY_BYTES = 240                      # ước lượng 1 bản ghi trong RAM khi mọi digest khác nhau (trường hợp xấu nhất)
+RECORD = struct.Struct(f"<{DIGEST_SIZE}sQQ")
+MAX_SPLIT_DEPTH = DIGEST_SIZE
+MIN_ENTRIES = 1024                     # bucket nhỏ hơn mức này thì không chia nữa
+
+
+def flight_key(u, v, info):
+    return json.dumps([u, v, list(info)], ensure_ascii = False)
+
+
+def flight_digest(u, v, info):
+    return hashlib.blake2b(flight_key(u, v, info).encode("utf-8"), digest_size = DIGEST_SIZE).digest()
+
+
+def _spill(buckets, digest, line_no, offset, depth):
+    buckets[digest[depth] % len(buckets)].write(RECORD.pack(digest, line_no, offset))
+
+
+def _max_entries(memory_budget):
+    return max(memory_budget // ENTRY_BYTES, MIN_ENTRIES)
+
+
+def _read_records(path, max_entries):
+    # Đọc theo khối không quá max_entries bản ghi
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(RECORD.size * min(max_entries, 65536)), b""):
+            yield from RECORD.iter_unpack(block)
+
+
+def _group_entries(records):
+    # digest -> array [số dòng, vị trí, số dòng, vị trí, ...] theo thứ tự dòng
+    seen = {}
+    for digest, line_no, offset in records:
+        seen.setdefault(digest, array('Q')).extend((line_no, offset))
+    return seen
+
+
+def _resolve(file, entries, max_entries):
+    # entries: (số dòng, vị trí) tăng dần của cùng 1 digest. Đọc lại từng dòng, gom theo bản ghi thật
+    # (loại trùng digest); nhóm dài được trả thành nhiều phần liên tiếp, mỗi phần <= max_entries dòng
+    first = None
+    lines = []
+    emitted = False
+    others = {}
+    for line_no, offset in entries:
+        record = read_flight_at(file, offset)
+        if first is None:
+            first = record
+        if record != first:
+            others.setdefault(record, []).append(line_no)
+            continue
+        lines.append(line_no)
+        if len(lines) >= max_entries:
+            yield (*first, lines)
+            lines = []
+            emitted = True
+    
+    if len(lines) > 1 or (lines and emitted):
+        yield (*first, lines)
+    for record, same in others.items():
+        if len(same) > 1:
+            yield (*record, same)
+
+
+def _pairs(entries):
+    return zip(entries[::2], entries[1::2])
+
+
+def _bucket_duplicates(file, path, max_entries, tmp_dir, depth, partitions):
+    count = os.path.getsize(path) // RECORD.size
+    if count > max_entries:
+        first = None
+        single = True
+        for digest, _, _ in _read_records(path, max_entries):
+            if first is None:
+                first = digest
+            elif digest != first:
+                single = False
+                break
+        
+        if single:
+            # Cả bucket là 1 digest: chia tiếp vô ích -> đọc thẳng các dòng ra (đã theo thứ tự dòng)
+            yield from _resolve(file, ((n, o) for _, n, o in _read_records(path, max_entries)), max_entries)
+            return
+        if depth + 1 < MAX_SPLIT_DEPTH:
+            # Bucket vẫn quá lớn -> chia tiếp theo byte kế tiếp của digest
+            parts = _open_buckets(tmp_dir, f"{os.path.basename(path)}_", partitions, max_entries)
+            for digest, line_no, offset in _read_records(path, max_entries):
+                _spill(parts, digest, line_no, offset, depth + 1)
+            yield from _drain_buckets(file, parts, max_entries, tmp_dir, depth + 1, partitions)
+            return
+    
+    seen = _group_entries(_read_records(path, max_entries))
+    for entries in seen.values():
+        if len(entries) > 2:
+            yield from _resolve(file, _pairs(entries), max_entries)
+
+
+def _open_buckets(tmp_dir, prefix, count, max_entries):
+    # Bộ đệm ghi của cả nhóm file cũng nằm trong ngân sách (tối đa 1/2)
+    buffering = max(RECORD.size * 16, min(io.DEFAULT_BUFFER_SIZE, max_entries * ENTRY_BYTES // (2 * count)))
+    return [open(os.path.join(tmp_dir, f"{prefix}{i}.bin"), "wb", buffering = buffering) for i in range(count)]
+
+
+def _drain_buckets(file, buckets, max_entries, tmp_dir, depth, partitions):
+    paths = []
+    for f in buckets:
+        f.close()
+        paths.append(f.name)
+    for path in paths:
+        yield from _bucket_duplicates(file, path, max_entries, tmp_dir, depth, partitions)
+        os.remove(path)
+
+
+def find_duplicate_flights(file_path, memory_budget = DEFAULT_MEMORY_BUDGET, tmp_dir = None, partitions = 64):
+    # Sinh (u, v, info, [số dòng...]) cho mọi bản ghi xuất hiện >= 2 lần. Nhóm dài hơn ngân sách được trả
+    # thành nhiều phần liên tiếp cùng (u, v, info). Không phải đổ ra đĩa -> theo thứ tự dòng đầu tiên,
+    # có đổ ra đĩa -> theo từng bucket.
+    max_entries = _max_entries(memory_budget)
+    seen = {}
+    count = 0
+    buckets = None
+    work_dir = None
+    
+    try:
+        for line_no, offset, u, v, info in iter_flight_offsets(file_path):
+            digest = flight_digest(u, v, info)
+            if buckets is not None:
+                _spill(buckets, digest, line_no, offset, 0)
+                continue
+            
+            seen.setdefault(digest, array('Q')).extend((line_no, offset))
+            count += 1
+            if count > max_entries:
+                work_dir = tempfile.mkdtemp(dir = tmp_dir)
+                buckets = _open_buckets(work_dir, "b", partitions, max_entries)
+                for d, entries in seen.items():
+                    for n, o in _pairs(entries):
+                        _spill(buckets, d, n, o, 0)
+                seen = None
+        
+        with open(file_path, "rb") as file:
+            if buckets is None:
+                groups = sorted((entries for entries in seen.values() if len(entries) > 2), key = lambda e: e[0])
+                seen = None
+                for entries in groups:
+                    yield from _resolve(file, _pairs(entries), max_entries)
+            else:
+                yield from _drain_buckets(file, buckets, max_entries, work_dir, 0, partitions)
+    finally:
+        if buckets is not None:
+            for f in buckets:
+                f.close()
+        if work_dir is not None:
+            shutil.rmtree(work_dir, ignore_errors = True)
+    
 if __name__ == "__main__":
     g = FlightGraph("g1.v2.jl")
     g.check_duplicates_vertices()  
@@ -1,7 +1,24 @@
-from collections import deque
+from collections import deque, OrderedDict
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import add
+import mmap
 import re
+import struct
+import sys
+import random
 import heapq
 
+INF = float('inf')
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Bảng khoảng cách mọi cặp đỉnh: header | ma trận n x n (float32 hoặc int32) theo hàng
+APSP_MAGIC = b"APSP"
+APSP_HEADER = struct.Struct("<4sIcxxxq")     # magic, version, kiểu phần tử ('f' / 'i'), n
+APSP_VERSION = 1
+UNREACHABLE_INT = -1
+
 def load_from_file(filename: str) -> dict:
     adj = {}
     with open(filename, 'r', encoding='utf-8') as f:
@@ -22,10 +39,30 @@ def load_from_file(filename: str) -> dict:
 
 class Graph:
     def __init__(self, filename, directed = True) -> None:
-        self.adj = load_from_file(filename)
+        self._build(load_from_file(filename), directed)
+    
+    @classmethod
+    def from_adj(cls, adj: dict, directed = True) -> "Graph":
+        graph = cls.__new__(cls)
+        graph._build(adj, directed)
+        return graph
+    
+    def _build(self, adj, directed) -> None:
+        self.adj = adj
         self.directed = directed
         self.vertices = set()
         self.edges = []
+        self._csr = None
+        self._rcsr = None
+        self._landmarks = None
+        
+        # Cache cây đường đi ngắn nhất theo nguồn: (loại, id nguồn) -> (dist, pred), LRU theo số byte
+        self._trees = OrderedDict()
+        self._tree_bytes = 0
+        self.cache_max_bytes = DEFAULT_CACHE_BYTES
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
         
         for u, neighbor in self.adj.items():
             self.vertices.add(u)
@@ -110,59 +147,372 @@ class Graph:
         return components
 
     def bfs_shortest_path(self, start, end) -> list:
-        visited = set()
-        queue = deque([start])
-        visited.add(start)
-        parent = {start: None}
+        ids = self._index()[1]
+        if start not in ids or end not in ids:
+            return [start] if start == end else None
+        
+        t = ids[end]
+        _, pred = self._tree("bfs", ids[start])
+        if pred[t] == -2:
+            return None
+        return self._path(pred, t)
+    
+    def _bfs_tree(self, s):
+        # pred[v] = đỉnh cha trên cây BFS, -1 ở gốc, -2 nếu không tới được
+        names, ids, offsets, targets, weights = self._index()
+        pred = array('i', [-2]) * len(names)
+        pred[s] = -1
+        queue = deque([s])
         
         while queue:
-            current_node = queue.popleft()
-            
-            if current_node == end:
+            u = queue.popleft()
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if pred[v] == -2:
+                    pred[v] = u
+                    queue.append(v)
+        
+        return None, pred
+    
+    # Đánh số đỉnh 0..n-1 theo thứ tự tăng dần, kề lưu dạng CSR (offsets, targets, weights)
+    def _index(self):
+        if self._csr is None:
+            names = sorted(self.vertices)
+            ids = {v: i for i, v in enumerate(names)}
+            offsets = array('i', [0])
+            targets = array('i')
+            weights = []
+            for v in names:
+                for t, w in self.adj.get(v, []):
+                    targets.append(ids[t])
+                    weights.append(w)
+                offsets.append(len(targets))
+            self._csr = (names, ids, offsets, targets, weights)
+        return self._csr
+    
+    def _reverse_index(self):
+        # CSR của các cung đi vào (cho tìm kiếm ngược từ đích)
+        if self._rcsr is None:
+            names, ids, offsets, targets, weights = self._index()
+            n = len(names)
+            counts = array('i', [0]) * (n + 1)
+            for v in targets:
+                counts[v + 1] += 1
+            for i in range(n):
+                counts[i + 1] += counts[i]
+            sources = array('i', [0]) * len(targets)
+            rweights = [0] * len(targets)
+            pos = array('i', counts)
+            for u in range(n):
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    sources[pos[v]] = u
+                    rweights[pos[v]] = weights[k]
+                    pos[v] += 1
+            self._rcsr = (names, ids, counts, sources, rweights)
+        return self._rcsr
+    
+    def _dijkstra(self, s, t = -1, csr = None, stats = None):
+        # dist/pred đánh chỉ số theo id đỉnh, heap chỉ chứa (khoảng cách, id);
+        # phần tử cũ bị bỏ qua khi lấy ra. t >= 0: dừng ngay khi lấy t ra khỏi heap
+        names, ids, offsets, targets, weights = csr or self._index()
+        n = len(names)
+        dist = [INF] * n
+        pred = array('i', [-1]) * n
+        done = bytearray(n)
+        dist[s] = 0
+        heap = [(0, s)]
+        
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            if u == t:
                 break
             
-            for neighbor, _ in self.adj.get(current_node, []):
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    parent[neighbor] = current_node
-                    queue.append(neighbor)
-                    
-        if end not in parent:
-            return None
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if not done[v]:
+                    nd = d + weights[k]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        pred[v] = u
+                        heapq.heappush(heap, (nd, v))
         
+        if stats is not None:
+            stats["settled"] = sum(done)
+        return dist, pred
+    
+    def _path(self, pred, t) -> list:
+        names = self._index()[0]
         path = []
-        current = end
-        while current is not None:
-            path.append(current)
-            current = parent[current]
+        while t != -1:
+            path.append(names[t])
+            t = pred[t]
         path.reverse()
         return path
+    
+    # stats (dict) nếu có: chạy tìm kiếm dừng sớm không qua cache, ghi số đỉnh đã chốt vào stats["settled"]
+    def dijkstra(self, start, end, stats = None):
+        ids = self._index()[1]
+        if start not in ids or end not in ids:
+            if stats is not None:
+                stats["settled"] = 0
+            return (0, [start]) if start == end else (INF, [])
+        
+        t = ids[end]
+        if stats is not None:
+            dist, pred = self._dijkstra(ids[start], t, stats = stats)
+        elif _estimated_tree_size(len(ids), True) <= self.cache_max_bytes:
+            dist, pred = self._tree("dijkstra", ids[start])
+        else:
+            # Cây không bao giờ vừa cache -> tìm dừng sớm ở t thay vì dựng cả cây rồi bỏ
+            if self.cache_max_bytes > 0:
+                self.cache_misses += 1
+            dist, pred = self._dijkstra(ids[start], t)
+        if dist[t] == INF:
+            return INF, []
+        return dist[t], self._path(pred, t)
+    
+    # Một nguồn -> mọi đỉnh: trả về (dist, pred) chỉ gồm các đỉnh tới được, pred[start] = None
+    def dijkstra_all(self, start) -> tuple:
+        names, ids = self._index()[:2]
+        if start not in ids:
+            return {start: 0}, {start: None}
+        
+        dist, pred = self._tree("dijkstra", ids[start])
+        dist_map = {}
+        pred_map = {}
+        for i, d in enumerate(dist):
+            if d != INF:
+                dist_map[names[i]] = d
+                pred_map[names[i]] = names[pred[i]] if pred[i] != -1 else None
+        return dist_map, pred_map
 
-    def dijkstra(self, start, end):
-        pq = [(0, start, [start])]
-        visited = set()
-        min_dist = {v: float('inf') for v in self.vertices}
-        min_dist[start] = 0
+    def dijkstra_bidirectional(self, start, end, stats = None):
+        # Dijkstra 2 chiều: xuôi từ start trên CSR, ngược từ end trên CSR đảo, mỗi bước mở rộng phía
+        # có đỉnh heap nhỏ hơn. mu = độ dài tốt nhất qua một cung nối 2 phía; dừng khi 2 đỉnh heap cộng lại >= mu
+        names, ids, offsets, targets, weights = self._index()
+        if stats is not None:
+            stats["settled"] = 0
+        if start not in ids or end not in ids or start == end:
+            return (0, [start]) if start == end else (INF, [])
         
-        while pq:
-            curr_dist, node, path = heapq.heappop(pq)
-            
-            if node in visited:
+        n = len(names)
+        s = ids[start]
+        t = ids[end]
+        sides = (self._index(), self._reverse_index())
+        dist = ([INF] * n, [INF] * n)
+        pred = (array('i', [-1]) * n, array('i', [-1]) * n)
+        done = (bytearray(n), bytearray(n))
+        heaps = ([(0, s)], [(0, t)])
+        dist[0][s] = 0
+        dist[1][t] = 0
+        mu = INF
+        meet = None
+        settled = 0
+        
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= mu:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, u = heapq.heappop(heaps[side])
+            if done[side][u]:
                 continue
-            visited.add(node)
+            done[side][u] = 1
+            settled += 1
             
-            if node == end:
-                return curr_dist, path
+            _, _, offs, tgts, ws = sides[side]
+            my_dist = dist[side]
+            other_dist = dist[1 - side]
+            for k in range(offs[u], offs[u + 1]):
+                v = tgts[k]
+                nd = d + ws[k]
+                if nd < my_dist[v]:
+                    my_dist[v] = nd
+                    pred[side][v] = u
+                    heapq.heappush(heaps[side], (nd, v))
+                if other_dist[v] != INF and nd + other_dist[v] < mu:
+                    mu = nd + other_dist[v]
+                    meet = (u, v) if side == 0 else (v, u)
+        
+        if stats is not None:
+            stats["settled"] = settled
+        if meet is None:
+            return INF, []
+        
+        # meet = (a, b): cung a -> b, a trên cây xuôi, b trên cây ngược
+        a, b = meet
+        path = self._path(pred[0], a)
+        while b != -1:
+            path.append(names[b])
+            b = pred[1][b]
+        return mu, path
+    
+    def build_landmarks(self, k = 8, seed = 0) -> list:
+        # ALT: chọn k mốc theo kiểu "xa nhất" (mốc sau xa các mốc trước nhất), lưu bảng
+        # d(mốc, v) và d(v, mốc). Bất đẳng thức tam giác cho cận dưới của d(v, t)
+        names, ids, offsets, targets, weights = self._index()
+        n = len(names)
+        self._landmarks = []
+        if n == 0:
+            return []
+        
+        rng = random.Random(seed)
+        reverse = self._reverse_index()
+        nearest = [INF] * n
+        current = rng.randrange(n)
+        while len(self._landmarks) < min(k, n):
+            forward = array('d', self._dijkstra(current)[0])
+            backward = array('d', self._dijkstra(current, csr = reverse)[0])
+            self._landmarks.append((current, forward, backward))
             
-            for neighbor, weight in self.adj.get(node, []):
-                if neighbor not in visited:
-                    new_dist = curr_dist + weight
-                    if new_dist < min_dist[neighbor]:
-                        min_dist[neighbor] = new_dist
-                        heapq.heappush(pq, (new_dist, neighbor, path + [neighbor]))
-                        
-        return float('inf'), []
+            # Mốc tiếp theo: đỉnh (liên thông với các mốc) xa mốc gần nó nhất
+            best = -1
+            for v in range(n):
+                d = min(forward[v], backward[v])
+                if d < nearest[v]:
+                    nearest[v] = d
+                if nearest[v] != INF and nearest[v] > 0 and (best == -1 or nearest[v] > nearest[best]):
+                    best = v
+            if best == -1:
+                break
+            current = best
+        return [names[l] for l, _, _ in self._landmarks]
+    
+    def _alt_bound(self, v, t):
+        bound = 0
+        for _, forward, backward in self._landmarks:
+            # d(v, t) >= d(L, t) - d(L, v) và d(v, t) >= d(v, L) - d(t, L)
+            a = forward[t] - forward[v]
+            b = backward[v] - backward[t]
+            if a > bound and a != INF and forward[v] != INF:
+                bound = a
+            if b > bound and b != INF and backward[t] != INF:
+                bound = b
+        return bound
+    
+    def dijkstra_alt(self, start, end, stats = None):
+        # A* với cận dưới từ các mốc (nhất quán -> đỉnh lấy ra lần đầu đã tối ưu)
+        names, ids, offsets, targets, weights = self._index()
+        if stats is not None:
+            stats["settled"] = 0
+        if start not in ids or end not in ids:
+            return (0, [start]) if start == end else (INF, [])
+        if self._landmarks is None:
+            self.build_landmarks()
+        
+        n = len(names)
+        s = ids[start]
+        t = ids[end]
+        dist = [INF] * n
+        pred = array('i', [-1]) * n
+        done = bytearray(n)
+        dist[s] = 0
+        heap = [(self._alt_bound(s, t), 0, s)]
+        settled = 0
+        
+        while heap:
+            _, d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            settled += 1
+            if u == t:
+                break
+            
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if not done[v]:
+                    nd = d + weights[k]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        pred[v] = u
+                        heapq.heappush(heap, (nd + self._alt_bound(v, t), nd, v))
+        
+        if stats is not None:
+            stats["settled"] = settled
+        if dist[t] == INF:
+            return INF, []
+        return dist[t], self._path(pred, t)
+    
+    def _tree(self, kind, s):
+        key = (kind, s)
+        tree = self._trees.get(key)
+        if tree is not None:
+            self.cache_hits += 1
+            self._trees.move_to_end(key)
+            return tree
+        
+        self.cache_misses += 1
+        tree = self._dijkstra(s) if kind == "dijkstra" else self._bfs_tree(s)
+        size = _tree_size(tree)
+        if size <= self.cache_max_bytes:
+            self._trees[key] = tree
+            self._tree_bytes += size
+            while self._tree_bytes > self.cache_max_bytes:
+                _, old = self._trees.popitem(last = False)
+                self._tree_bytes -= _tree_size(old)
+                self.cache_evictions += 1
+        return tree
+    
+    # Gọi sau khi sửa self.adj trực tiếp; base_undirected tự gọi
+    def invalidate(self) -> None:
+        self._csr = None
+        self._rcsr = None
+        self._landmarks = None
+        self._trees.clear()
+        self._tree_bytes = 0
+    
+    def cache_stats(self) -> dict:
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "evictions": self.cache_evictions,
+            "entries": len(self._trees),
+            "bytes": self._tree_bytes,
+            "max_bytes": self.cache_max_bytes,
+        }
 
+    def all_pairs(self, engine = "auto", dtype = 'f', workers = None, path = None):
+        # Khoảng cách mọi cặp theo thứ tự sorted(self.vertices); trả về (names, ma trận phẳng n*n).
+        # dtype 'f': float32, không tới được = inf; 'i': int32 (trọng số nguyên), không tới được = -1.
+        # path: ghi thẳng vào file qua mmap, ma trận trả về là memoryview trên file (đọc lại bằng load_all_pairs)
+        names, ids, offsets, targets, weights = self._index()
+        n = len(names)
+        if dtype not in ('f', 'i'):
+            raise ValueError("dtype phải là 'f' hoặc 'i'")
+        negative = any(w < 0 for w in weights)
+        if engine == "auto":
+            engine = choose_all_pairs_engine(negative)
+        if engine not in ("floyd", "dijkstra"):
+            raise ValueError("engine phải là 'auto', 'floyd' hoặc 'dijkstra'")
+        if engine == "dijkstra" and negative:
+            raise ValueError("Dijkstra không dùng được với trọng số âm, chọn engine='floyd'")
+        
+        out, mm = _open_matrix(n, dtype, path)
+        try:
+            if engine == "floyd":
+                rows = enumerate(_floyd_rows(n, offsets, targets, weights))
+            elif workers and workers > 1 and n > 1:
+                rows = _parallel_dijkstra_rows(n, offsets, targets, weights, workers)
+            else:
+                rows = ((s, _dijkstra_row(n, offsets, targets, weights, s)) for s in range(n))
+            
+            for s, row in rows:
+                out[s * n:(s + 1) * n] = _encode_row(row, dtype)
+        except BaseException:
+            if mm is not None:
+                out.release()
+                mm.close()
+            raise
+        
+        if mm is not None:
+            mm.flush()
+            out = _MappedMatrix(out, mm)
+        return names, out
+    
     def base_undirected(self):
         undirected_adj = {}
         undirected_edges = set()
@@ -180,6 +530,144 @@ class Graph:
         self.adj = undirected_adj
         self.edges = list(undirected_edges)
         self.directed = False
+        self.invalidate()
+
+
+def _tree_size(tree) -> int:
+    dist, pred = tree
+    return _estimated_tree_size(len(pred), dist is not None)
+
+
+def _estimated_tree_size(n, with_dist) -> int:
+    # Ước lượng: mảng pred (int32) và list dist (con trỏ + số thực); chỉ phụ thuộc n -> biết trước khi tìm
+    size = 4 * n
+    if with_dist:
+        size += sys.getsizeof([]) + 32 * n
+    return size
+
+
+def choose_all_pairs_engine(negative) -> str:
+    # Đo thực tế (không có numpy): Floyd theo hàng bằng map() vẫn chậm hơn n lần Dijkstra 2-5 lần
+    # kể cả trên đồ thị đầy đủ, nên không xét mật độ: Floyd chỉ dùng khi có trọng số âm (Dijkstra sai)
+    return "floyd" if negative else "dijkstra"
+
+
+def _floyd_rows(n, offsets, targets, weights):
+    # Mỗi bước k cập nhật cả hàng i bằng map(min, ...) thay cho vòng lặp j
+    dist = [[INF] * n for _ in range(n)]
+    for u in range(n):
+        row = dist[u]
+        row[u] = 0
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            if weights[k] < row[v]:
+                row[v] = weights[k]
+    
+    for k in range(n):
+        row_k = dist[k]
+        for i in range(n):
+            d_ik = dist[i][k]
+            if d_ik != INF and i != k:
+                dist[i] = list(map(min, dist[i], map(add, repeat(d_ik), row_k)))
+    
+    for u in range(n):
+        if dist[u][u] < 0:
+            raise ValueError("đồ thị có chu trình âm")
+    return dist
+
+
+def _dijkstra_row(n, offsets, targets, weights, s):
+    dist = [INF] * n
+    done = bytearray(n)
+    dist[s] = 0
+    heap = [(0, s)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = 1
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def _dijkstra_rows_chunk(n, offsets, targets, weights, sources):
+    return [(s, _dijkstra_row(n, offsets, targets, weights, s)) for s in sources]
+
+
+def _parallel_dijkstra_rows(n, offsets, targets, weights, workers, chunks_per_worker = 4):
+    size = -(-n // (workers * chunks_per_worker))
+    chunks = [range(i, min(i + size, n)) for i in range(0, n, size)]
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        parts = pool.map(_dijkstra_rows_chunk, repeat(n), repeat(offsets), repeat(targets), repeat(weights), chunks)
+        for part in parts:
+            yield from part
+
+
+def _encode_row(row, dtype):
+    if dtype == 'f':
+        return array('f', row)
+    return array('i', (UNREACHABLE_INT if d == INF else int(d) for d in row))
+
+
+def _open_matrix(n, dtype, path):
+    if path is None:
+        return array(dtype, bytes(4 * n * n)), None
+    total = APSP_HEADER.size + 4 * n * n
+    with open(path, "w+b") as f:
+        f.truncate(total)
+        mm = mmap.mmap(f.fileno(), total)
+    APSP_HEADER.pack_into(mm, 0, APSP_MAGIC, APSP_VERSION, dtype.encode(), n)
+    return memoryview(mm)[APSP_HEADER.size:].cast(dtype), mm
+
+
+class _MappedMatrix:
+    # Ma trận trên mmap: truy cập như array (len, [i], lát cắt); close() để giải phóng file
+    def __init__(self, view, mm):
+        self._view = view
+        self._mmap = mm
+    
+    def __len__(self):
+        return len(self._view)
+    
+    def __getitem__(self, k):
+        return self._view[k]
+    
+    def tolist(self):
+        return self._view.tolist()
+    
+    def close(self):
+        if self._mmap is not None:
+            self._view.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+def load_all_pairs(path):
+    # Mở bảng đã ghi bằng Graph.all_pairs(path=...) ở chế độ chỉ đọc -> (n, ma trận)
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    magic, version, dtype, n = APSP_HEADER.unpack_from(mm, 0)
+    if magic != APSP_MAGIC or version != APSP_VERSION:
+        mm.close()
+        raise ValueError(f"{path}: không phải bảng khoảng cách")
+    view = memoryview(mm)[APSP_HEADER.size:APSP_HEADER.size + 4 * n * n].cast(dtype.decode())
+    return n, _MappedMatrix(view, mm)
+
+
+def path_from_pred(pred: dict, end) -> list:
+    if end not in pred:
+        return []
+    path = []
+    while end is not None:
+        path.append(end)
+        end = pred[end]
+    path.reverse()
+    return path
 
 if __name__ == "__main__":
     filename = 'graph.txt'
@@ -0,0 +1,239 @@
+import argparse
+import heapq
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from LAB_07 import Graph, load_all_pairs
+from ch import ContractionHierarchy
+
+
+def time_call(fn, repeat = 1):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# Bản Dijkstra cũ (chép đường đi vào mỗi phần tử heap), giữ lại để so sánh
+def dijkstra_path_copy(graph, start, end):
+    pq = [(0, start, [start])]
+    visited = set()
+    min_dist = {v: float('inf') for v in graph.vertices}
+    min_dist[start] = 0
+
+    while pq:
+        curr_dist, node, path = heapq.heappop(pq)
+        if node in visited:
+            continue
+        visited.add(node)
+        if node == end:
+            return curr_dist, path
+
+        for neighbor, weight in graph.adj.get(node, []):
+            if neighbor not in visited:
+                new_dist = curr_dist + weight
+                if new_dist < min_dist[neighbor]:
+                    min_dist[neighbor] = new_dist
+                    heapq.heappush(pq, (new_dist, neighbor, path + [neighbor]))
+
+    return float('inf'), []
+
+
+# Đồ thị sinh có seed cố định
+def random_adj(n, m, seed = 0, max_weight = 100):
+    rnd = random.Random(seed)
+    adj = {}
+    for _ in range(m):
+        u = rnd.randrange(n)
+        adj.setdefault(u, []).append((rnd.randrange(n), rnd.randint(1, max_weight)))
+    return adj
+
+
+def grid_adj(side, seed = 0, max_weight = 100):
+    # Lưới side x side có hướng 2 chiều -> đường đi ngắn nhất dài cỡ 2 * side đỉnh
+    rnd = random.Random(seed)
+    adj = {}
+    for r in range(side):
+        for c in range(side):
+            u = r * side + c
+            for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if 0 <= r + dr < side and 0 <= c + dc < side:
+                    adj.setdefault(u, []).append(((r + dr) * side + c + dc, rnd.randint(1, max_weight)))
+    return adj
+
+
+def bench_dijkstra(cases, pairs = 3, seed = 0):
+    # Cột cũ/mới/mọi đích đo Dijkstra không cache; cache đo riêng: lần đầu (dựng cả cây) và lần lặp lại
+    rows = []
+    rnd = random.Random(seed)
+    for label, adj in cases:
+        g = Graph.from_adj(adj)
+        g.cache_max_bytes = 0
+        cached = Graph.from_adj(adj)
+        vertices = sorted(g.vertices)
+        g.dijkstra(vertices[0], vertices[0])    # dựng chỉ mục CSR trước khi đo
+        for _ in range(pairs):
+            s, t = rnd.choice(vertices), rnd.choice(vertices)
+            old_seconds, old_result = time_call(lambda: dijkstra_path_copy(g, s, t))
+            new_seconds, new_result = time_call(lambda: g.dijkstra(s, t))
+            all_seconds, _ = time_call(lambda: g.dijkstra_all(s))
+            assert old_result[0] == new_result[0]
+
+            cached.invalidate()
+            cached._index()
+            miss_seconds, _ = time_call(lambda: cached.dijkstra(s, t))
+            hit_seconds, cached_result = time_call(lambda: cached.dijkstra(s, t))
+            assert cached_result[0] == new_result[0]
+            rows.append((label, len(g.edges), s, t, len(new_result[1]),
+                         old_seconds, peak_memory(lambda: dijkstra_path_copy(g, s, t)),
+                         new_seconds, peak_memory(lambda: g.dijkstra(s, t)), all_seconds,
+                         miss_seconds, hit_seconds))
+    return rows
+
+
+def bench_point_to_point(cases, pairs = 10, landmarks = 8, seed = 0):
+    # Số đỉnh đã chốt và thời gian: dijkstra dừng sớm / 2 chiều / ALT (thời gian dựng mốc tính riêng)
+    rows = []
+    rnd = random.Random(seed)
+    for label, adj in cases:
+        g = Graph.from_adj(adj)
+        vertices = sorted(g.vertices)
+        build_seconds, _ = time_call(lambda: g.build_landmarks(landmarks, seed))
+        g._reverse_index()
+        totals = {name: [0.0, 0] for name in ("dijkstra", "bidirectional", "alt")}
+        for _ in range(pairs):
+            s, t = rnd.choice(vertices), rnd.choice(vertices)
+            results = []
+            for name, fn in (("dijkstra", g.dijkstra), ("bidirectional", g.dijkstra_bidirectional),
+                             ("alt", g.dijkstra_alt)):
+                stats = {}
+                seconds, result = time_call(lambda: fn(s, t, stats))
+                totals[name][0] += seconds
+                totals[name][1] += stats["settled"]
+                results.append(result[0])
+            assert results[0] == results[1] == results[2]
+        rows.append((label, len(g.edges), build_seconds,
+                     {name: (seconds / pairs, settled / pairs) for name, (seconds, settled) in totals.items()}))
+    return rows
+
+
+def bench_ch(cases, queries = 1000, seed = 0):
+    # Tiền xử lý CH, ghi/đọc file, thời gian truy vấn so với dijkstra dừng sớm, và số cặp sai khác
+    rows = []
+    for label, adj in cases:
+        g = Graph.from_adj(adj)
+        g.cache_max_bytes = 0
+        build_seconds, hierarchy = time_call(lambda: ContractionHierarchy.build(g))
+
+        fd, path = tempfile.mkstemp(suffix = ".json")
+        os.close(fd)
+        try:
+            hierarchy.save(path)
+            size = os.path.getsize(path)
+            load_seconds, hierarchy = time_call(lambda: ContractionHierarchy.load(path))
+        finally:
+            os.remove(path)
+
+        rnd = random.Random(seed)
+        pairs = [(rnd.choice(hierarchy.names), rnd.choice(hierarchy.names)) for _ in range(queries)]
+        ch_seconds, _ = time_call(lambda: [hierarchy.shortest_path(s, t) for s, t in pairs])
+        sample = pairs[:max(queries // 20, 1)]
+        dijkstra_seconds, _ = time_call(lambda: [g.dijkstra(s, t) for s, t in sample])
+        mismatches = hierarchy.validate(g, len(sample), seed)
+        rows.append((label, len(g.edges), build_seconds, size, load_seconds, hierarchy.core_size,
+                     ch_seconds / len(pairs), dijkstra_seconds / len(sample), len(mismatches)))
+    return rows
+
+
+def bench_all_pairs(cases, workers = 2):
+    # Bảng mọi cặp: floyd / dijkstra tuần tự / dijkstra song song, và ghi ra file mmap
+    rows = []
+    for label, adj in cases:
+        g = Graph.from_adj(adj)
+        n = len(g.vertices)
+        floyd_seconds = time_call(lambda: g.all_pairs(engine = "floyd"))[0] if n <= 400 else None
+        serial_seconds, (_, matrix) = time_call(lambda: g.all_pairs(engine = "dijkstra"))
+        parallel_seconds, _ = time_call(lambda: g.all_pairs(engine = "dijkstra", workers = workers))
+
+        fd, path = tempfile.mkstemp(suffix = ".apsp")
+        os.close(fd)
+        try:
+            mmap_seconds, (_, mapped) = time_call(lambda: g.all_pairs(path = path))
+            mapped.close()
+            size = os.path.getsize(path)
+            _, loaded = load_all_pairs(path)
+            same = loaded.tolist() == matrix.tolist()
+            loaded.close()
+        finally:
+            os.remove(path)
+        rows.append((label, n, len(g.edges), floyd_seconds, serial_seconds, parallel_seconds,
+                     mmap_seconds, size, same))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type = int, nargs = "+", default = [100000, 1000000])
+    parser.add_argument("--pairs", type = int, default = 3)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--p2p", action = "store_true", help = "so sánh dijkstra / 2 chiều / ALT")
+    parser.add_argument("--landmarks", type = int, default = 8)
+    parser.add_argument("--ch", action = "store_true", help = "contraction hierarchies")
+    parser.add_argument("--queries", type = int, default = 1000)
+    parser.add_argument("--apsp", action = "store_true", help = "khoảng cách mọi cặp đỉnh")
+    parser.add_argument("--workers", type = int, default = os.cpu_count())
+    args = parser.parse_args()
+
+    cases = []
+    for m in args.edges:
+        cases.append((f"random m={m}", random_adj(m // 5, m, args.seed)))
+        side = int((m / 4) ** 0.5)
+        cases.append((f"grid {side}x{side}", grid_adj(side, args.seed)))
+
+    if args.apsp:
+        for (label, n, m, floyd_seconds, serial_seconds, parallel_seconds,
+             mmap_seconds, size, same) in bench_all_pairs(cases, args.workers):
+            floyd = f"{floyd_seconds:7.2f} s" if floyd_seconds is not None else "      -  "
+            print(f"  {label:<18} n={n:<6} m={m:<8} floyd {floyd}  dijkstra {serial_seconds:7.2f} s"
+                  f"  song song ({args.workers}) {parallel_seconds:7.2f} s"
+                  f"  | mmap {mmap_seconds:7.2f} s {size / 2**20:6.1f} MiB  khớp {same}")
+        raise SystemExit(0)
+
+    if args.ch:
+        for (label, m, build_seconds, size, load_seconds, core_size,
+             ch_query, dijkstra_query, mismatches) in bench_ch(cases, args.queries, args.seed):
+            print(f"  {label:<18} m={m:<8} dựng {build_seconds:7.1f} s  file {size / 2**20:6.1f} MiB"
+                  f"  đọc {load_seconds:5.2f} s  lõi {core_size}"
+                  f"  | CH {ch_query * 1e3:7.3f} ms/truy vấn  dijkstra {dijkstra_query * 1e3:8.3f} ms"
+                  f"  sai {mismatches}")
+        raise SystemExit(0)
+
+    if args.p2p:
+        for label, m, build_seconds, totals in bench_point_to_point(cases, args.pairs, args.landmarks, args.seed):
+            print(f"  {label:<18} m={m:<8} dựng {args.landmarks} mốc {build_seconds:7.2f} s")
+            for name, (seconds, settled) in totals.items():
+                print(f"      {name:<14} {seconds:8.4f} s/truy vấn  {settled:10.0f} đỉnh chốt")
+        raise SystemExit(0)
+
+    for (label, m, s, t, length, old_seconds, old_peak, new_seconds, new_peak, all_seconds,
+         miss_seconds, hit_seconds) in bench_dijkstra(cases, args.pairs, args.seed):
+        print(f"  {label:<18} m={m:<8} {s}->{t} ({length} đỉnh)"
+              f"  cũ {old_seconds:7.3f} s {old_peak / 2**20:7.1f} MiB"
+              f"  | mới {new_seconds:7.3f} s {new_peak / 2**20:7.1f} MiB"
+              f"  | mọi đích {all_seconds:7.3f} s"
+              f"  | cache: lần đầu {miss_seconds:7.3f} s, lặp lại {hit_seconds * 1e3:7.3f} ms")
@@ -0,0 +1,311 @@
+import heapq
+import json
+import random
+from array import array
+
+INF = float('inf')
+FORMAT_VERSION = 1
+
+
+# Contraction hierarchies cho LAB_07 Graph (self.adj: {u: [(v, w), ...]}, có hướng).
+# Tiền xử lý 1 lần: rút gọn đỉnh theo thứ tự tăng dần độ "quan trọng", thêm cung tắt (shortcut)
+# để giữ khoảng cách. Truy vấn: Dijkstra 2 chiều chỉ đi lên theo thứ hạng -> chỉ chạm vài trăm đỉnh.
+class ContractionHierarchy:
+    def __init__(self, names, rank, up, down):
+        self.names = names
+        self.ids = {v: i for i, v in enumerate(names)}
+        self.rank = rank
+        # up[u]   = (offsets, targets, weights, mids): cung u -> v, rank[v] > rank[u]
+        # down[v] = (offsets, sources, weights, mids): cung u -> v, rank[u] > rank[v] (duyệt ngược)
+        # mids[k] = đỉnh giữa của cung tắt, -1 nếu là cung gốc
+        self.up = up
+        self.down = down
+        self._mid = None
+        self.core_size = 0
+
+    @classmethod
+    def build(cls, graph, hop_limit = 8, settle_limit = 200, priority_hop_limit = 2, priority_settle_limit = 30,
+              core_degree = 400):
+        names = sorted(graph.vertices)
+        ids = {v: i for i, v in enumerate(names)}
+        n = len(names)
+
+        # Đồ thị còn lại: out_edges[u][v] = (w, mid), in_edges[v][u] = cùng giá trị; cung song song giữ cái nhẹ nhất
+        out_edges = [dict() for _ in range(n)]
+        in_edges = [dict() for _ in range(n)]
+        for u, neighbor in graph.adj.items():
+            a = ids[u]
+            for v, w in neighbor:
+                b = ids[v]
+                if a != b and (b not in out_edges[a] or w < out_edges[a][b][0]):
+                    out_edges[a][b] = (w, -1)
+                    in_edges[b][a] = (w, -1)
+
+        contracted = bytearray(n)
+        core = bytearray(n)
+        deleted_neighbors = array('i', [0]) * n
+        depth = array('i', [0]) * n
+        rank = array('i', [0]) * n
+        up_lists = [None] * n
+        down_lists = [None] * n
+
+        def witness_distances(u, skip, limit, targets, max_settled, max_hops):
+            # Dijkstra cục bộ từ u, bỏ qua đỉnh skip; dừng khi đã chốt mọi đỉnh trong targets,
+            # vượt limit, quá max_settled đỉnh hoặc quá max_hops bước
+            dist = {u: 0}
+            heap = [(0, 0, u)]
+            settled = 0
+            remaining = len(targets)
+            while heap and settled < max_settled and remaining:
+                d, hops, x = heapq.heappop(heap)
+                if d > dist[x]:
+                    continue
+                if d > limit:
+                    break
+                settled += 1
+                if x in targets:
+                    remaining -= 1
+                if hops >= max_hops:
+                    continue
+                for y, (w, _) in out_edges[x].items():
+                    if y == skip:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(y, INF):
+                        dist[y] = nd
+                        heapq.heappush(heap, (nd, hops + 1, y))
+            return dist
+
+        def shortcuts(v, max_settled, max_hops):
+            # Các cung tắt u -> w (qua v) cần thêm nếu rút gọn v bây giờ
+            result = []
+            outs = out_edges[v]
+            if not outs:
+                return result
+            max_out = max(w for w, _ in outs.values())
+            for u, (a, _) in in_edges[v].items():
+                dist = witness_distances(u, v, a + max_out, outs, max_settled, max_hops)
+                for w_node, (b, _) in outs.items():
+                    if w_node != u and dist.get(w_node, INF) > a + b:
+                        result.append((u, w_node, a + b))
+            return result
+
+        def priority(v):
+            # 2 x hiệu số cạnh + số láng giềng đã rút gọn + độ sâu (giữ hierarchy cân đối, nông);
+            # ước lượng với witness search ngắn hơn lúc rút gọn thật
+            edge_diff = len(shortcuts(v, priority_settle_limit, priority_hop_limit)) - len(in_edges[v]) - len(out_edges[v])
+            return 2 * edge_diff + deleted_neighbors[v] + depth[v]
+
+        prio = array('i', (priority(v) for v in range(n)))
+        heap = [(prio[v], v) for v in range(n)]
+        heapq.heapify(heap)
+        level = 0
+        while heap:
+            p, v = heapq.heappop(heap)
+            if contracted[v] or core[v] or p != prio[v]:
+                continue
+            if len(in_edges[v]) * len(out_edges[v]) > core_degree:
+                # Đỉnh quá dày: không rút gọn, để lại trong lõi (core) ở tầng trên cùng
+                core[v] = 1
+                continue
+
+            for u, w_node, weight in shortcuts(v, settle_limit, hop_limit):
+                old = out_edges[u].get(w_node)
+                if old is None or weight < old[0]:
+                    out_edges[u][w_node] = (weight, v)
+                    in_edges[w_node][u] = (weight, v)
+
+            # Láng giềng còn lại đều được rút gọn sau v -> thứ hạng cao hơn
+            up_lists[v] = [(w_node, w, mid) for w_node, (w, mid) in out_edges[v].items()]
+            down_lists[v] = [(u, w, mid) for u, (w, mid) in in_edges[v].items()]
+            neighbors = set(out_edges[v]) | set(in_edges[v])
+            for w_node in out_edges[v]:
+                del in_edges[w_node][v]
+            for u in in_edges[v]:
+                del out_edges[u][v]
+            out_edges[v] = {}
+            in_edges[v] = {}
+
+            contracted[v] = 1
+            rank[v] = level
+            level += 1
+
+            # Chỉ láng giềng của v đổi độ ưu tiên -> tính lại và đẩy bản mới (bản cũ bị bỏ qua khi lấy ra)
+            for x in neighbors:
+                deleted_neighbors[x] += 1
+                depth[x] = max(depth[x], depth[v] + 1)
+                if not core[x]:
+                    prio[x] = priority(x)
+                    heapq.heappush(heap, (prio[x], x))
+
+        # Lõi: giữ nguyên mọi cung giữa các đỉnh lõi ở cả 2 chiều -> truy vấn đi tự do trong lõi
+        for v in range(n):
+            if core[v]:
+                up_lists[v] = [(w_node, w, mid) for w_node, (w, mid) in out_edges[v].items()]
+                down_lists[v] = [(u, w, mid) for u, (w, mid) in in_edges[v].items()]
+                rank[v] = level
+                level += 1
+
+        hierarchy = cls(names, rank, _pack(up_lists), _pack(down_lists))
+        hierarchy.core_size = sum(core)
+        return hierarchy
+
+    def save(self, path):
+        data = {"version": FORMAT_VERSION, "names": self.names, "rank": list(self.rank), "core_size": self.core_size}
+        for key, (offsets, targets, weights, mids) in (("up", self.up), ("down", self.down)):
+            data[key] = {"offsets": list(offsets), "targets": list(targets), "weights": weights, "mids": list(mids)}
+        with open(path, "w", encoding = "utf-8") as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding = "utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: phiên bản hierarchy không hỗ trợ")
+
+        def unpack(part):
+            return (array('i', part["offsets"]), array('i', part["targets"]), part["weights"], array('i', part["mids"]))
+
+        hierarchy = cls(data["names"], array('i', data["rank"]), unpack(data["up"]), unpack(data["down"]))
+        hierarchy.core_size = data["core_size"]
+        return hierarchy
+
+    def _search(self, s, t):
+        # Dijkstra 2 chiều trên đồ thị đi lên; mỗi phía dừng khi đỉnh heap >= độ dài tốt nhất đã biết
+        dist = ({s: 0}, {t: 0})
+        pred = ({s: -1}, {t: -1})
+        heaps = ([(0, s)], [(0, t)])
+        graphs = (self.up, self.down)
+        best = INF
+        meet = -1
+        if s == t:
+            best, meet = 0, s
+
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            d, u = heapq.heappop(heaps[side])
+            if d >= best:
+                heaps[side].clear()
+                continue
+            if d > dist[side][u]:
+                continue
+            other = dist[1 - side].get(u)
+            if other is not None and d + other < best:
+                best = d + other
+                meet = u
+
+            # Stall-on-demand: có cung từ đỉnh hạng cao hơn cho khoảng cách nhỏ hơn -> u không nằm
+            # trên đường ngắn nhất của phía này, không cần mở rộng
+            my_dist = dist[side]
+            offsets, targets, weights, _ = graphs[1 - side]
+            stalled = False
+            for k in range(offsets[u], offsets[u + 1]):
+                x = my_dist.get(targets[k])
+                if x is not None and x + weights[k] < d:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+
+            offsets, targets, weights, _ = graphs[side]
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                nd = d + weights[k]
+                if nd < my_dist.get(v, INF):
+                    my_dist[v] = nd
+                    pred[side][v] = u
+                    heapq.heappush(heaps[side], (nd, v))
+        return best, meet, pred
+
+    def distance(self, start, end):
+        if start not in self.ids or end not in self.ids:
+            return 0 if start == end else INF
+        return self._search(self.ids[start], self.ids[end])[0]
+
+    def shortest_path(self, start, end):
+        # Cùng dạng kết quả với Graph.dijkstra: (khoảng cách, [đỉnh...]) hoặc (inf, [])
+        if start not in self.ids or end not in self.ids:
+            return (0, [start]) if start == end else (INF, [])
+        best, meet, pred = self._search(self.ids[start], self.ids[end])
+        if meet == -1:
+            return INF, []
+
+        # Chuỗi cung trên hierarchy: s ... meet ... t, rồi bung từng cung tắt
+        forward = []
+        x = meet
+        while x != -1:
+            forward.append(x)
+            x = pred[0][x]
+        forward.reverse()
+        x = pred[1][meet]
+        while x != -1:
+            forward.append(x)
+            x = pred[1][x]
+
+        path = [forward[0]]
+        for a, b in zip(forward, forward[1:]):
+            self._unpack_edge(a, b, path)
+        return best, [self.names[i] for i in path]
+
+    def _edge_mid(self, a, b):
+        if self._mid is None:
+            mid = {}
+            offsets, targets, weights, mids = self.up
+            for u in range(len(self.names)):
+                for k in range(offsets[u], offsets[u + 1]):
+                    mid[(u, targets[k])] = mids[k]
+            offsets, sources, weights, mids = self.down
+            for v in range(len(self.names)):
+                for k in range(offsets[v], offsets[v + 1]):
+                    mid[(sources[k], v)] = mids[k]
+            self._mid = mid
+        return self._mid[(a, b)]
+
+    def _unpack_edge(self, a, b, path):
+        # Thêm các đỉnh sau a trên cung a -> b (đã bung hết cung tắt) vào path, không đệ quy
+        stack = [(a, b)]
+        while stack:
+            x, y = stack.pop()
+            m = self._edge_mid(x, y)
+            if m == -1:
+                path.append(y)
+            else:
+                stack.append((m, y))
+                stack.append((x, m))
+
+    def validate(self, graph, pairs = 1000, seed = 0):
+        # So với graph.dijkstra trên các cặp ngẫu nhiên; trả về danh sách cặp sai khác
+        rnd = random.Random(seed)
+        names = self.names
+        mismatches = []
+        if not names:
+            return mismatches
+        for _ in range(pairs):
+            s, t = rnd.choice(names), rnd.choice(names)
+            expected = graph.dijkstra(s, t)[0]
+            got, path = self.shortest_path(s, t)
+            if got != expected or (path and _path_length(graph, path) != got):
+                mismatches.append((s, t, expected, got))
+        return mismatches
+
+
+def _pack(lists):
+    offsets = array('i', [0])
+    targets = array('i')
+    weights = []
+    mids = array('i')
+    for edges in lists:
+        for v, w, mid in edges:
+            targets.append(v)
+            weights.append(w)
+            mids.append(mid)
+        offsets.append(len(targets))
+    return offsets, targets, weights, mids
+
+
+def _path_length(graph, path):
+    total = 0
+    for a, b in zip(path, path[1:]):
+        total += min((w for v, w in graph.adj.get(a, []) if v == b), default = INF)
+    return total
@@ -1,6 +1,7 @@
 import re
 import json
 from collections import deque
+from array import array
 import heapq
 
 
@@ -72,29 +73,81 @@ def prim_mst(adj, start_node):
           
     return mst_weight, mst_edge      
 
-def dijkstra(adj, vertices, start, end):
-    visited = set()
-    min_dist = {v: float('inf') for v in vertices}
-    min_dist[start] = 0
-    heap = [(0, start, [start])] 
+# Đánh số đỉnh theo thứ tự tăng dần; dist/pred là mảng theo id, heap chỉ chứa (khoảng cách, id)
+def index_vertices(vertices):
+    names = sorted(vertices)
+    return names, {v: i for i, v in enumerate(names)}
+
+def dijkstra_arrays(adj, names, ids, s, t = -1):
+    n = len(names)
+    dist = [float('inf')] * n
+    pred = array('i', [-1]) * n
+    done = bytearray(n)
+    dist[s] = 0
+    heap = [(0, s)]
     
     while heap:
-        cur_dist, node, path = heapq.heappop(heap)
-        if node in visited:
+        cur_dist, u = heapq.heappop(heap)
+        if done[u]:
             continue
-        visited.add(node)
-        
-        if node == end:
-            return cur_dist, path
+        done[u] = 1
+        if u == t:
+            break
         
-        for neighbor, weight in adj[node].items():
-            if neighbor not in visited:
+        for neighbor, weight in adj.get(names[u], {}).items():
+            v = ids[neighbor]
+            if not done[v]:
                 new_dist = cur_dist + weight
-                if new_dist < min_dist[neighbor]:
-                    min_dist[neighbor] = new_dist
-                    heapq.heappush(heap, (new_dist, neighbor, path + [neighbor]))
-        
-    return float['inf'], []   
+                if new_dist < dist[v]:
+                    dist[v] = new_dist
+                    pred[v] = u
+                    heapq.heappush(heap, (new_dist, v))
+    
+    return dist, pred
+
+def trace_path(names, pred, t):
+    path = []
+    while t != -1:
+        path.append(names[t])
+        t = pred[t]
+    path.reverse()
+    return path
+
+def dijkstra(adj, vertices, start, end):
+    names, ids = index_vertices(vertices)
+    if start not in ids or end not in ids:
+        return (0, [start]) if start == end else (float('inf'), [])
+    
+    t = ids[end]
+    dist, pred = dijkstra_arrays(adj, names, ids, ids[start], t)
+    if dist[t] == float('inf'):
+        return float('inf'), []
+    return dist[t], trace_path(names, pred, t)
+
+# Một nguồn -> mọi đỉnh tới được: (dist, pred), pred[start] = None
+def dijkstra_all(adj, vertices, start):
+    names, ids = index_vertices(vertices)
+    if start not in ids:
+        return {start: 0}, {start: None}
+    
+    dist, pred = dijkstra_arrays(adj, names, ids, ids[start])
+    dist_map = {}
+    pred_map = {}
+    for i, d in enumerate(dist):
+        if d != float('inf'):
+            dist_map[names[i]] = d
+            pred_map[names[i]] = names[pred[i]] if pred[i] != -1 else None
+    return dist_map, pred_map
+
+def path_from_pred(pred, end):
+    if end not in pred:
+        return []
+    path = []
+    while end is not None:
+        path.append(end)
+        end = pred[end]
+    path.reverse()
+    return path
 
 if __name__ == '__main__':
     vertices, adj = read_undirected_graph('g1.v2.jl')